@@ -1,8 +1,12 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
+from typing import Optional, Dict
 import asyncio
+import os
+import re
+import json
+import time
+import uuid
 import uvicorn
 from pathlib import Path
 import logging
@@ -10,6 +14,14 @@ import warnings
 
 # Import your main CrewAI system
 from main import career_advisor_crew
+from llm_handler import llm_handler
+from model_router import model_router
+from semantic_cache import task_output_cache
+from cancellation import CancellationToken, CrewCancelledError, cancellation_scope
+from output_budgets import OUTPUT_MODE, task_metrics
+from degraded_mode import degraded_engine
+from static_assets import static_assets, REVALIDATE_CACHE
+from tracing import TRACE_DIR, Trace, tracing_scope, finish_trace
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
@@ -21,29 +33,154 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Serve static files (HTML, CSS, JS)
-app.mount("/static", StaticFiles(directory="."), name="static")
+# Static files are served only from the whitelisted static/ directory (see static_assets.py)
+
+# Crew worker slots - the shared crew instance carries per-request state, so default to one
+crew_slots = asyncio.Semaphore(int(os.getenv("MAX_CONCURRENT_CREWS", "1")))
+
+# How often to check for a client disconnect while a crew is running (seconds)
+DISCONNECT_POLL_SECONDS = 1.0
+
+# Cancellation tokens of queued/running jobs, keyed by job id
+active_jobs: Dict[str, CancellationToken] = {}
+
+# Requests waiting for a crew slot
+queued_jobs = 0
+
+# Load shedding: overflow traffic and provider outages go straight to the local degraded-mode engine
+LOAD_SHEDDING = os.getenv("LOAD_SHEDDING", "auto")  # auto | off | always
+LOAD_SHED_QUEUE_DEPTH = int(os.getenv("LOAD_SHED_QUEUE_DEPTH", "4"))
+LOAD_SHED_ERROR_RATE = float(os.getenv("LOAD_SHED_ERROR_RATE", "0.8"))
+LOAD_SHED_COOLDOWN = float(os.getenv("LOAD_SHED_COOLDOWN", "60"))  # seconds before re-probing providers
 
 class CareerRequest(BaseModel):
     user_info: str
+    fast_mode: Optional[bool] = None  # Quick preview using only fast-tier models
+    job_id: Optional[str] = None  # Client-chosen id for POST /api/jobs/{job_id}/cancel
 
 class CareerResponse(BaseModel):
     report: str
     success: bool
     message: str
+    degraded: bool = False  # True when served by the local degraded-mode engine
+    trace_id: Optional[str] = None  # Set when the request was profiled (X-Trace: 1)
 
-@app.get("/")
-async def read_root():
+@app.api_route("/", methods=["GET", "HEAD"])
+async def read_root(request: Request):
     """Serve the demo landing page first"""
-    return FileResponse('demo.html')
+    return static_assets.response(request, "demo.html", cache_control=REVALIDATE_CACHE)
 
-@app.get("/app")
-async def read_app():
+@app.api_route("/app", methods=["GET", "HEAD"])
+async def read_app(request: Request):
     """Serve the main application"""
-    return FileResponse('index.html')
+    return static_assets.response(request, "index.html", cache_control=REVALIDATE_CACHE)
+
+@app.api_route("/static/{name:path}", methods=["GET", "HEAD"])
+async def read_static(request: Request, name: str):
+    """Serve a whitelisted asset from static/"""
+    return static_assets.response(request, name)
+
+def load_shed_reason() -> Optional[str]:
+    """Why the next request should skip the crew, or None to run it normally"""
+    if LOAD_SHEDDING == "off":
+        return None
+    if LOAD_SHEDDING == "always":
+        return "degraded mode forced"
+    
+    if queued_jobs >= LOAD_SHED_QUEUE_DEPTH:
+        return f"{queued_jobs} requests already waiting"
+    
+    # Every provider failing recently - don't make users sit through the retry chains.
+    # Once the cooldown passes, the next request goes through and re-probes the providers.
+    telemetry = llm_handler.telemetry
+    models = {getattr(llm, 'model', '') for chain in llm_handler.llm_providers.values() for llm in chain}
+    now = time.time()
+    if all(
+        telemetry.error_rate(model) >= LOAD_SHED_ERROR_RATE
+        and now - (telemetry.last_updated(model) or 0.0) < LOAD_SHED_COOLDOWN
+        for model in models
+    ):
+        return "all LLM providers unhealthy"
+    
+    return None
+
+def degraded_response(user_info: str, reason: str) -> CareerResponse:
+    """Instant personalized report from the local template engine"""
+    print(f"⚡ Load shedding ({reason}) - serving degraded-mode report")
+    return CareerResponse(
+        report=degraded_engine.render(user_info),
+        success=True,
+        message=f"Quick career report generated while our AI advisors are busy ({reason}).",
+        degraded=True
+    )
+
+def start_trace(http_request: Request, name: str) -> Optional[Trace]:
+    """Opt-in profiling: a span tree is recorded only for requests sent with X-Trace: 1"""
+    if http_request.headers.get("x-trace", "").lower() in ("1", "true", "yes"):
+        return Trace(name, path=http_request.url.path)
+    return None
+
+def _kickoff_in_scope(token: CancellationToken, trace: Optional[Trace], **kickoff_kwargs):
+    """Worker-thread entry point: run the crew with the job's cancellation token and trace in scope"""
+    try:
+        with cancellation_scope(token), tracing_scope(trace):
+            return career_advisor_crew.kickoff(**kickoff_kwargs)
+    finally:
+        if trace is not None:
+            finish_trace(trace)
+
+def _release_crew_slot(worker: asyncio.Future):
+    """Done-callback for crew workers: free the slot and consume abandoned results"""
+    crew_slots.release()
+    if not worker.cancelled():
+        worker.exception()
+
+async def run_crew_cancellable(http_request: Request, job_id: Optional[str],
+                               trace: Optional[Trace] = None, **kickoff_kwargs):
+    """
+    Run the crew in a worker thread and cancel it if the client disconnects
+    or the job is cancelled explicitly. Raises CrewCancelledError on cancel.
+    """
+    job_id = job_id or uuid.uuid4().hex
+    token = CancellationToken()
+    active_jobs[job_id] = token
+    
+    global queued_jobs
+    
+    try:
+        # Wait for a free worker slot, giving up if the client leaves while queued
+        queued_jobs += 1
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(crew_slots.acquire(), timeout=DISCONNECT_POLL_SECONDS)
+                    break
+                except asyncio.TimeoutError:
+                    if await http_request.is_disconnected():
+                        token.cancel("client disconnected while queued")
+                    token.raise_if_cancelled()
+        finally:
+            queued_jobs -= 1
+        
+        # The slot is freed as soon as the worker thread unwinds, even if we stop waiting earlier
+        worker = asyncio.ensure_future(asyncio.to_thread(_kickoff_in_scope, token, trace, **kickoff_kwargs))
+        worker.add_done_callback(_release_crew_slot)
+        
+        while not worker.done():
+            await asyncio.wait({worker}, timeout=DISCONNECT_POLL_SECONDS)
+            if not worker.done() and await http_request.is_disconnected():
+                token.cancel("client disconnected")
+            if token.cancelled:
+                print(f"🛑 Job {job_id} cancelled ({token.reason}) - releasing worker")
+                raise CrewCancelledError(token.reason)
+        
+        return worker.result()
+    
+    finally:
+        active_jobs.pop(job_id, None)
 
 @app.post("/api/generate-career-report", response_model=CareerResponse)
-async def generate_career_report(request: CareerRequest):
+async def generate_career_report(request: CareerRequest, http_request: Request):
     """
     Generate a comprehensive career report using the CrewAI system
     """
@@ -51,6 +188,10 @@ async def generate_career_report(request: CareerRequest):
         print(f"🚀 Starting career analysis for user...")
         print(f"📋 User Info Preview: {request.user_info[:100]}...")
         
+        shed_reason = load_shed_reason()
+        if shed_reason:
+            return degraded_response(request.user_info, shed_reason)
+        
         # Prepare inputs for CrewAI
         inputs = {
             "user_info": request.user_info
@@ -58,7 +199,15 @@ async def generate_career_report(request: CareerRequest):
         
         # Run the CrewAI system with robust error handling
         print("🤖 Initializing AI agents with robust error handling...")
-        result = career_advisor_crew.kickoff(inputs=inputs)
+        trace = start_trace(http_request, "career_report")
+        result = await run_crew_cancellable(
+            http_request,
+            request.job_id,
+            trace,
+            inputs=inputs,
+            endpoint="default",
+            fast_mode=request.fast_mode
+        )
         
         # Convert result to string if it's not already
         report_text = str(result)
@@ -69,9 +218,14 @@ async def generate_career_report(request: CareerRequest):
         return CareerResponse(
             report=report_text,
             success=True,
-            message="Career report generated successfully!"
+            message="Career report generated successfully!",
+            trace_id=trace.trace_id if trace else None
         )
         
+    except CrewCancelledError as e:
+        print(f"🛑 Career report cancelled: {str(e)}")
+        raise HTTPException(status_code=499, detail="Career report request was cancelled")
+        
     except Exception as e:
         print(f"❌ Error generating career report: {str(e)}")
         raise HTTPException(
@@ -79,6 +233,91 @@ async def generate_career_report(request: CareerRequest):
             detail=f"Failed to generate career report: {str(e)}"
         )
 
+@app.post("/api/preview-career-report", response_model=CareerResponse)
+async def preview_career_report(request: CareerRequest, http_request: Request):
+    """
+    Generate a quick preview report using the 'preview' routing profile (fast models only)
+    """
+    try:
+        print(f"⚡ Starting fast preview for user...")
+        
+        shed_reason = load_shed_reason()
+        if shed_reason:
+            return degraded_response(request.user_info, shed_reason)
+        
+        trace = start_trace(http_request, "career_preview")
+        result = await run_crew_cancellable(
+            http_request,
+            request.job_id,
+            trace,
+            inputs={"user_info": request.user_info},
+            endpoint="preview",
+            fast_mode=request.fast_mode
+        )
+        
+        return CareerResponse(
+            report=str(result),
+            success=True,
+            message="Career preview generated successfully!",
+            trace_id=trace.trace_id if trace else None
+        )
+        
+    except CrewCancelledError as e:
+        print(f"🛑 Career preview cancelled: {str(e)}")
+        raise HTTPException(status_code=499, detail="Career preview request was cancelled")
+        
+    except Exception as e:
+        print(f"❌ Error generating career preview: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate career preview: {str(e)}"
+        )
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running career report job"""
+    token = active_jobs.get(job_id)
+    if token is None:
+        raise HTTPException(status_code=404, detail=f"No active job with id {job_id}")
+    
+    token.cancel("cancelled by client")
+    return {"job_id": job_id, "cancelled": True}
+
+@app.get("/api/routing")
+async def get_routing_status():
+    """Current routing policy and per-model latency/error telemetry"""
+    return {
+        "policy": model_router.policy,
+        "telemetry": llm_handler.telemetry.snapshot(),
+        "usage": llm_handler.telemetry.usage_snapshot(),
+        "retries": llm_handler.telemetry.retry_snapshot()
+    }
+
+@app.get("/api/cache")
+async def get_cache_status():
+    """Semantic task-output cache statistics"""
+    return task_output_cache.stats()
+
+@app.get("/api/task-metrics")
+async def get_task_metrics():
+    """Average output tokens and duration per task, split by output mode"""
+    return {
+        "output_mode": OUTPUT_MODE,
+        "budgets": career_advisor_crew.output_budgets,
+        "tasks": task_metrics.summary()
+    }
+
+@app.get("/api/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Chrome trace of a profiled request - load it in chrome://tracing or ui.perfetto.dev"""
+    if not re.fullmatch(r"[0-9a-f]{12}", trace_id):
+        raise HTTPException(status_code=400, detail="Invalid trace id")
+    path = os.path.join(TRACE_DIR, f"{trace_id}.json")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"No trace with id {trace_id}")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
@@ -111,6 +350,9 @@ async def get_system_status():
             "OpenRouter Claude (Secondary)"
         ],
         "search_provider": "Serper Dev",
+        "queued_jobs": queued_jobs,
+        "load_shedding": load_shed_reason() or "inactive",
+        "static_assets": dict(static_assets.stats()),
         "status": "operational"
     }
 
@@ -0,0 +1,84 @@
+# Cooperative Cancellation for Crew Runs
+# Lets app.py stop an in-flight crew when the client disconnects or cancels the job
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from crewai.hooks import HookAborted, register_before_llm_call_hook
+
+
+class CrewCancelledError(HookAborted):
+    """
+    Raised inside a crew run once its cancellation token has been triggered.
+    A HookAborted, so CrewAI lets it out of an agent instead of retrying the step.
+    """
+
+
+class CancellationToken:
+    """Thread-safe flag shared between the request handler and the crew worker thread"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = ""
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CrewCancelledError(f"Crew run cancelled: {self.reason}")
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds, waking early on cancel. Returns True if cancelled"""
+        return self._event.wait(timeout)
+
+
+# Token for the crew run executing in the current thread/context
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar("crew_cancellation_token", default=None)
+
+
+@contextmanager
+def cancellation_scope(token: CancellationToken):
+    """Make `token` visible to every checkpoint reached from this context"""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def check_cancelled(*_args, **_kwargs):
+    """
+    Cancellation checkpoint - raises CrewCancelledError if the current run was cancelled.
+    Accepts and ignores arguments so it can be used directly as a CrewAI step/task callback
+    or before-LLM-call hook.
+    """
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def is_cancelled() -> bool:
+    """True once the current run was cancelled - for code that must not raise, like tools"""
+    token = _current_token.get()
+    return token is not None and token.cancelled
+
+
+def sleep_unless_cancelled(delay: float):
+    """Interruptible replacement for time.sleep inside a crew run"""
+    token = _current_token.get()
+    if token is None:
+        threading.Event().wait(delay)
+    elif token.wait(delay):
+        token.raise_if_cancelled()
+
+
+# Checkpoint before every LLM call of every agent, so a cancelled run stops mid-task
+register_before_llm_call_hook(check_cancelled)
@@ -0,0 +1,248 @@
+# Degraded-Mode Report Engine
+# Builds a personalized career report locally in milliseconds when LLM providers are unavailable
+
+import json
+import re
+from string import Template
+from typing import List, Dict, Any, Optional
+from knowledge_index import DATASET_PATH, tokenize
+from semantic_cache import STAGE_PATTERNS, split_name
+
+STAGE_LABELS = {
+    "high_school": "High School Student",
+    "college": "College Student",
+    "graduate": "Graduate Student",
+    "professional": "Working Professional",
+}
+
+# Next steps per career stage
+STAGE_ACTIONS = {
+    "high_school": [
+        "Talk to your school counselor about courses that match the careers below",
+        "Join a club, competition or volunteer activity related to your top interest",
+        "Start one free beginner course from the resources section this month",
+        "Shadow or interview someone working in one of the suggested careers",
+    ],
+    "college": [
+        "Choose electives or a minor that build the key skills listed below",
+        "Apply for at least one internship or research position this semester",
+        "Build a small portfolio project you can show employers",
+        "Visit your campus career center and set up informational interviews",
+    ],
+    "graduate": [
+        "Align your thesis or projects with the careers you are targeting",
+        "Publish or present your work to build visibility in the field",
+        "Earn one industry-recognized certification from the resources below",
+        "Reach out to alumni working in your target roles",
+    ],
+    "professional": [
+        "Map your existing experience to the key skills of your target career",
+        "Close the biggest skill gap with one focused course or certification",
+        "Take on a project at work that uses your target skills",
+        "Update your resume and LinkedIn for the new direction and start networking",
+    ],
+}
+
+# Form labels and filler from index.html's user_info format - never evidence of an interest
+IGNORED_TOKENS = set(tokenize(
+    "name current stage interests passions skills experience achievements career goals work "
+    "preferences not specified looking guidance open all options seeking recommendations resume "
+    "user analysis file type size note high school college university"
+))
+
+# Careers suggested when nothing in the profile matches a rule
+DEFAULT_CAREER_IDS = ["software-developer", "registered-nurse", "digital-marketer", "ux-designer", "teacher"]
+
+REPORT_TEMPLATE = Template("""
+# 🎯 ${title}
+*Quick report generated instantly while our AI advisors are busy - request a full analysis any time.*
+
+## Executive Summary
+As a **${stage}** interested in ${interests}, these career paths are a strong starting point for you.
+
+## Top Career Recommendations
+${careers}
+
+## Immediate Action Plan (Next 3-6 Months)
+${actions}
+
+## Key Skills to Develop
+${skills}
+
+## Essential Resources
+${resources}
+
+## Next Steps
+- Pick the career above that excites you most and explore it for two weeks
+- Try the free resources first before committing to paid programs
+- Come back later for your full AI-powered career analysis
+""")
+
+CAREER_TEMPLATE = Template("""### ${rank}. ${title}
+${description}
+- **Why it fits**: matches your interest in ${reasons}
+- **Education**: ${education}
+- **Salary (US)**: Entry ${entry} | Mid ${mid} | Senior ${senior}
+- **Outlook**: ${outlook}""")
+
+RESOURCE_TEMPLATE = Template("- [${title}](${url}) - ${provider}, ${cost}")
+
+
+class DegradedReportEngine:
+    """
+    Keyword rule engine over the bundled career dataset
+
+    All rules and templates are compiled once at startup, so rendering
+    a report is a handful of set intersections and string substitutions.
+    """
+
+    def __init__(self, dataset_path: str = DATASET_PATH):
+        with open(dataset_path, "r", encoding="utf-8") as f:
+            dataset = json.load(f)
+
+        self.careers = {career["id"]: career for career in dataset["careers"]}
+        self.resources = {resource["id"]: resource for resource in dataset["resources"]}
+
+        # Rule per career: weighted keyword sets plus whole-phrase patterns for titles/aliases
+        self._rules = []
+        for career in dataset["careers"]:
+            phrases = [career["title"].lower()] + [alias.lower() for alias in career["aliases"]]
+            self._rules.append({
+                "career": career,
+                "strong": set(tokenize(" ".join([career["title"]] + career["aliases"]))),
+                "weak": set(tokenize(" ".join(career["skills"] + [career["cluster"]]))),
+                "phrase": re.compile("|".join(rf"\b{re.escape(phrase)}\b" for phrase in phrases)),
+            })
+
+    def detect_stage(self, user_info: str) -> str:
+        lowered = user_info.lower()
+        for stage, pattern in STAGE_PATTERNS.items():
+            if pattern.search(lowered):
+                return stage
+        return "high_school" if "school" in lowered else "professional"
+
+    def match_careers(self, user_info: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Best matching careers with the keywords that triggered them"""
+        lowered = user_info.lower()
+        tokens = set(tokenize(lowered)) - IGNORED_TOKENS
+
+        scored = []
+        for position, rule in enumerate(self._rules):
+            strong = tokens & rule["strong"]
+            weak = tokens & rule["weak"]
+            score = 2 * len(strong) + len(weak) + (3 if rule["phrase"].search(lowered) else 0)
+            if score:
+                scored.append((score, -position, rule["career"], sorted(strong | weak)))
+
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        matches = [{"career": career, "reasons": reasons} for _, _, career, reasons in scored[:limit]]
+
+        for career_id in DEFAULT_CAREER_IDS:
+            if len(matches) >= limit:
+                break
+            if all(match["career"]["id"] != career_id for match in matches):
+                matches.append({"career": self.careers[career_id], "reasons": []})
+        return matches
+
+    def _career_section(self, matches: List[Dict[str, Any]]) -> str:
+        blocks = []
+        for rank, match in enumerate(matches, start=1):
+            career = match["career"]
+            blocks.append(CAREER_TEMPLATE.substitute(
+                rank=rank,
+                title=career["title"],
+                description=career["description"],
+                reasons=", ".join(match["reasons"]) or career["cluster"].lower(),
+                education=career["education"],
+                entry=career["salary_bands"]["entry"],
+                mid=career["salary_bands"]["mid"],
+                senior=career["salary_bands"]["senior"],
+                outlook=career["outlook"],
+            ))
+        return "\n\n".join(blocks)
+
+    def _skills_section(self, matches: List[Dict[str, Any]]) -> str:
+        skills = []
+        for match in matches:
+            for skill in match["career"]["skills"]:
+                if skill not in skills:
+                    skills.append(skill)
+        return "\n".join(f"- {skill.title()}" for skill in skills[:8])
+
+    def _resources_section(self, matches: List[Dict[str, Any]]) -> str:
+        resource_ids = []
+        for match in matches:
+            for resource_id in match["career"]["resources"]:
+                if resource_id not in resource_ids:
+                    resource_ids.append(resource_id)
+        return "\n".join(RESOURCE_TEMPLATE.substitute(self.resources[rid]) for rid in resource_ids[:6])
+
+    def _context(self, user_info: str) -> Dict[str, Any]:
+        name, profile_text = split_name(user_info)
+        matches = self.match_careers(profile_text)
+        interests = [reason for match in matches for reason in match["reasons"]]
+        stage = self.detect_stage(profile_text)
+        return {
+            "title": f"Career Guidance Report for {name}" if name else "Your Career Guidance Report",
+            "stage_key": stage,
+            "stage": STAGE_LABELS[stage],
+            "interests": ", ".join(dict.fromkeys(interests)) or "exploring your options",
+            "matches": matches,
+        }
+
+    def render(self, user_info: str) -> str:
+        """Full personalized report"""
+        context = self._context(user_info)
+        return REPORT_TEMPLATE.substitute(
+            title=context["title"],
+            stage=context["stage"],
+            interests=context["interests"],
+            careers=self._career_section(context["matches"]),
+            actions="\n".join(f"{i}. {action}" for i, action in enumerate(STAGE_ACTIONS[context["stage_key"]], start=1)),
+            skills=self._skills_section(context["matches"]),
+            resources=self._resources_section(context["matches"]),
+        )
+
+    def section(self, agent_type: str, user_info: str) -> Optional[str]:
+        """Personalized stand-in for a single agent's output, or None if not covered"""
+        context = self._context(user_info)
+        matches = context["matches"]
+
+        if agent_type == "profile_analysis":
+            return (
+                f"# User Profile Analysis\n\n"
+                f"- **Stage**: {context['stage']}\n"
+                f"- **Interests detected**: {context['interests']}\n"
+                f"- **Promising directions**: {', '.join(m['career']['title'] for m in matches)}"
+            )
+        if agent_type == "career_exploration":
+            return "# Career Path Recommendations\n\n" + self._career_section(matches)
+        if agent_type == "skill_development":
+            return "# Skill Development Roadmap\n\n" + self._skills_section(matches) + \
+                "\n\n## Learning Resources\n" + self._resources_section(matches)
+        if agent_type == "market_analysis":
+            lines = [
+                f"- **{m['career']['title']}**: Entry {m['career']['salary_bands']['entry']} | "
+                f"Mid {m['career']['salary_bands']['mid']} | Senior {m['career']['salary_bands']['senior']}. "
+                f"{m['career']['outlook']}"
+                for m in matches
+            ]
+            return "# Job Market Analysis\n\n" + "\n".join(lines)
+        if agent_type == "roadmap_strategy":
+            return "# Career Roadmap\n\n" + "\n".join(
+                f"{i}. {action}" for i, action in enumerate(STAGE_ACTIONS[context["stage_key"]], start=1)
+            )
+        if agent_type == "learning_resources":
+            return "# Learning Resources & Recommendations\n\n" + self._resources_section(matches)
+        if agent_type == "report_generation":
+            # The other sections are already in the combined report - only summarize them
+            return (
+                f"# Summary\n\n"
+                f"As a **{context['stage']}** interested in {context['interests']}, your strongest matches are "
+                f"{', '.join(m['career']['title'] for m in matches)}.\n\n"
+                f"**Next step**: pick the career that excites you most and work through its roadmap and resources above."
+            )
+        return None
+
+# Global instance - compiled once at startup
+degraded_engine = DegradedReportEngine()
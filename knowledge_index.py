@@ -0,0 +1,307 @@
+# Local Career Knowledge Index
+# Precompiled, memory-mapped keyword index over careers, skills, resources and salary bands
+
+import os
+import re
+import sys
+import json
+import math
+import mmap
+import struct
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional, Tuple, Type
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DATASET_PATH = os.path.join(DATA_DIR, "career_knowledge.json")
+INDEX_PATH = os.path.join(DATA_DIR, "career_knowledge.idx")
+
+# File layout: MAGIC | header length (uint64 LE) | JSON header | record blob
+INDEX_MAGIC = b"CKIDX1\n"
+# Bumped whenever the weighting changes, so existing index files are rebuilt
+INDEX_VERSION = "2"
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.5  # milder than the usual 0.75 - career records are long by design
+# Title/alias tokens count this many times, so "cybersecurity" finds the career, not every long record mentioning it
+TITLE_WEIGHT = 3
+# Added for a whole title/alias phrase in the query
+PHRASE_BOOST = 3.0
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "for", "from", "i", "in", "into",
+    "is", "it", "like", "likes", "me", "my", "of", "on", "or", "the", "to", "who",
+    "what", "with", "am", "student", "grader", "junior", "senior",
+}
+
+# Common shorthand in user profiles mapped to the vocabulary used by the dataset
+QUERY_SYNONYMS = {
+    "bio": "biology",
+    "art": "drawing",
+    "arts": "drawing",
+    "ai": "machine learning",
+    "ml": "machine learning",
+    "coding": "programming",
+    "code": "programming",
+    "math": "mathematics",
+    "maths": "mathematics",
+    "cyber": "cybersecurity",
+    "doctor": "physician",
+    "medical": "medicine",
+    "pay": "salary",
+    "cert": "certification",
+    "certs": "certification",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed and a light plural strip"""
+    tokens = []
+    for word in re.findall(r"[a-z0-9+#]+", text.lower()):
+        if word in STOPWORDS:
+            continue
+        for token in QUERY_SYNONYMS.get(word, word).split():
+            if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+                token = token[:-1]
+            tokens.append(token)
+    return tokens
+
+
+def _dataset_fingerprint(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(INDEX_VERSION.encode("utf-8") + f.read()).hexdigest()
+
+
+def _render_career(career: Dict[str, Any], resources: Dict[str, Dict[str, Any]]) -> str:
+    bands = career["salary_bands"]
+    lines = [
+        f"## {career['title']} ({career['cluster']})",
+        career["description"],
+        f"- **Key skills**: {', '.join(career['skills'])}",
+        f"- **Education**: {career['education']}",
+        f"- **Salary bands (US)**: Entry {bands['entry']} | Mid {bands['mid']} | Senior {bands['senior']}",
+        f"- **Outlook**: {career['outlook']}",
+        "- **Recommended resources**:",
+    ]
+    for resource_id in career["resources"]:
+        resource = resources[resource_id]
+        lines.append(f"  - [{resource['title']}]({resource['url']}) - {resource['provider']}, {resource['cost']}")
+    return "\n".join(lines)
+
+
+def _render_skill(skill: Dict[str, Any], resources: Dict[str, Dict[str, Any]], careers: List[str]) -> str:
+    lines = [f"## Skill: {skill['name']} ({skill['type']})"]
+    if careers:
+        lines.append(f"- **Used in**: {', '.join(careers)}")
+    lines.append("- **Learn it with**:")
+    for resource_id in skill["resources"]:
+        resource = resources[resource_id]
+        lines.append(f"  - [{resource['title']}]({resource['url']}) - {resource['provider']}, {resource['cost']}")
+    return "\n".join(lines)
+
+
+def _render_resource(resource: Dict[str, Any]) -> str:
+    return (
+        f"## Resource: [{resource['title']}]({resource['url']})\n"
+        f"- **Provider**: {resource['provider']}\n"
+        f"- **Cost**: {resource['cost']} | **Duration**: {resource['duration']} | **Level**: {resource['level']}"
+    )
+
+
+def build_index(dataset_path: str = DATASET_PATH, index_path: str = INDEX_PATH) -> str:
+    """
+    Compile the bundled dataset into a memory-mappable index file
+
+    Each career, skill and resource becomes one pre-rendered markdown record.
+    The header holds record offsets and a term -> [(record, BM25 weight)] map,
+    so lookups never parse the record blob. Title and alias tokens are weighted
+    up (BM25F-style) so short skill records don't outrank the matching career.
+    """
+    with open(dataset_path, "r", encoding="utf-8") as f:
+        dataset = json.load(f)
+
+    resources = {resource["id"]: resource for resource in dataset["resources"]}
+    docs: List[Tuple[str, str, str, str]] = []  # (title, title/alias text, other searchable text, rendered record)
+
+    for career in dataset["careers"]:
+        text = " ".join([
+            career["cluster"], career["description"], " ".join(career["skills"]), "salary career",
+        ])
+        title_text = " ".join([career["title"]] + career["aliases"])
+        docs.append((career["title"], title_text, text, _render_career(career, resources)))
+
+    for skill in dataset["skills"]:
+        used_in = [career["title"] for career in dataset["careers"] if skill["name"] in career["skills"]]
+        text = f"{skill['type']} " + " ".join(used_in)
+        docs.append((skill["name"], skill["name"], text, _render_skill(skill, resources, used_in)))
+
+    for resource in dataset["resources"]:
+        text = f"{resource['provider']} {resource['level']} course certification resource"
+        docs.append((resource["title"], resource["title"], text, _render_resource(resource)))
+
+    # Title/alias phrases get a boost so "data analyst" ranks the career above the skills
+    phrases: Dict[str, List[int]] = {}
+    for doc_id, career in enumerate(dataset["careers"]):
+        for phrase in [career["title"]] + career["aliases"]:
+            phrases.setdefault(phrase.lower(), []).append(doc_id)
+
+    document_frequency: Dict[str, int] = {}
+    term_counts = []
+    for _, title_text, text, _ in docs:
+        counts: Dict[str, int] = {}
+        for token in tokenize(title_text):
+            counts[token] = counts.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        term_counts.append(counts)
+        for token in counts:
+            document_frequency[token] = document_frequency.get(token, 0) + 1
+
+    average_length = sum(sum(counts.values()) for counts in term_counts) / max(1, len(docs))
+    postings: Dict[str, List[List[float]]] = {}
+    for doc_id, counts in enumerate(term_counts):
+        length_norm = 1 - BM25_B + BM25_B * sum(counts.values()) / average_length
+        for token, count in counts.items():
+            df = document_frequency[token]
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            weight = idf * count * (BM25_K1 + 1) / (count + BM25_K1 * length_norm)
+            postings.setdefault(token, []).append([doc_id, round(weight, 5)])
+
+    blob = bytearray()
+    offsets = []
+    for title, _, _, record in docs:
+        data = record.encode("utf-8")
+        offsets.append([len(blob), len(data), title])
+        blob.extend(data)
+
+    header = json.dumps({
+        "fingerprint": _dataset_fingerprint(dataset_path),
+        "records": offsets,
+        "postings": postings,
+        "phrases": phrases,
+    }, separators=(",", ":")).encode("utf-8")
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(INDEX_MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(blob)
+    os.replace(tmp_path, index_path)
+
+    logger.info(f"Built career knowledge index with {len(docs)} records at {index_path}")
+    return index_path
+
+
+class CareerKnowledgeIndex:
+    """Read-only view over a compiled index file backed by mmap"""
+
+    def __init__(self, index_path: str = INDEX_PATH):
+        self.index_path = index_path
+        with open(index_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError(f"Not a career knowledge index: {index_path}")
+
+        start = len(INDEX_MAGIC)
+        (header_length,) = struct.unpack("<Q", self._mmap[start:start + 8])
+        header_start = start + 8
+        header = json.loads(self._mmap[header_start:header_start + header_length])
+
+        self._blob_start = header_start + header_length
+        self.fingerprint = header["fingerprint"]
+        self.records = header["records"]
+        self.postings = header["postings"]
+        self.phrases = header["phrases"]
+
+    def record(self, doc_id: int) -> str:
+        """Rendered markdown for one record, read straight from the mapped file"""
+        offset, length, _ = self.records[doc_id]
+        start = self._blob_start + offset
+        return self._mmap[start:start + length].decode("utf-8")
+
+    def search(self, query: str, limit: int = 3) -> List[Tuple[float, int]]:
+        """Rank records for a free-text query, best first"""
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            for doc_id, weight in self.postings.get(token, []):
+                scores[int(doc_id)] = scores.get(int(doc_id), 0.0) + weight
+
+        lowered = query.lower()
+        for phrase, doc_ids in self.phrases.items():
+            if re.search(rf"\b{re.escape(phrase)}\b", lowered):
+                for doc_id in doc_ids:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + PHRASE_BOOST
+
+        ranked = sorted(((score, doc_id) for doc_id, score in scores.items()), reverse=True)
+        return ranked[:limit]
+
+    def lookup(self, query: str, limit: int = 3) -> Optional[str]:
+        """Markdown for the best matches, or None when nothing relevant is indexed"""
+        hits = self.search(query, limit)
+        if not hits:
+            return None
+        return "\n\n".join(self.record(doc_id) for _, doc_id in hits)
+
+    def close(self):
+        self._mmap.close()
+
+
+_index: Optional[CareerKnowledgeIndex] = None
+
+
+def get_index() -> CareerKnowledgeIndex:
+    """Shared index instance, (re)built when missing or older than the dataset"""
+    global _index
+    if _index is None:
+        fingerprint = _dataset_fingerprint(DATASET_PATH)
+        if os.path.exists(INDEX_PATH):
+            _index = CareerKnowledgeIndex(INDEX_PATH)
+            if _index.fingerprint != fingerprint:
+                _index.close()
+                _index = None
+        if _index is None:
+            build_index()
+            _index = CareerKnowledgeIndex(INDEX_PATH)
+    return _index
+
+
+class KnowledgeLookupInput(BaseModel):
+    """Input schema for CareerKnowledgeTool"""
+    query: str = Field(..., description="Career, skill, certification or interest to look up, e.g. 'data analyst salary' or 'biology drawing'")
+
+
+class CareerKnowledgeTool(BaseTool):
+    name: str = "Career Knowledge Base"
+    description: str = (
+        "Instant local lookup of well-known careers, the skills they need, typical US salary bands, "
+        "education paths and recommended courses/certifications with links. "
+        "Use this FIRST for standard facts; only search the web for very recent or niche information."
+    )
+    args_schema: Type[BaseModel] = KnowledgeLookupInput
+
+    def _run(self, query: str) -> str:
+        try:
+            result = get_index().lookup(query)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Career knowledge index unavailable: {e}")
+            return "Knowledge base unavailable - use web search instead."
+
+        if result is None:
+            return f"No local knowledge found for '{query}'. Use web search for this topic."
+        return result
+
+
+if __name__ == "__main__":
+    # python knowledge_index.py            -> rebuild the index
+    # python knowledge_index.py "<query>"  -> rebuild if needed and run a lookup
+    if len(sys.argv) > 1:
+        print(get_index().lookup(" ".join(sys.argv[1:])) or "No matches.")
+    else:
+        print(f"✅ Index written to {build_index()}")
@@ -2,11 +2,15 @@
 # Handles errors gracefully across multiple API providers
 
 import time
+import random
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from crewai import LLM
 import os
 from dotenv import load_dotenv
+from cancellation import CrewCancelledError, check_cancelled, sleep_unless_cancelled
+from provider_errors import ProviderError, classify_error
+from tracing import trace_span
 
 # Load environment variables
 load_dotenv()
@@ -15,6 +19,104 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ProviderTelemetry:
+    """
+    Rolling latency, error-rate and cost statistics per model.
+    Fed by CrewAI's LLM call events (see prompt_cache.py) and read by the routing policy.
+    """
+    
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha  # EWMA smoothing factor
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.usage: Dict[str, Dict[str, int]] = {}  # Token counts per LiteLLM call, incl. prompt-cache hits
+        self.retries: Dict[str, Dict[str, float]] = {}  # Backoff behaviour per model
+    
+    def record(self, model: str, latency: float, success: bool, cost: float = 0.0):
+        """Record a single LLM call"""
+        stats = self.stats.setdefault(model, {
+            "calls": 0,
+            "failures": 0,
+            "latency_ewma": latency,
+            "error_rate": 0.0,
+            "cost_total": 0.0,
+            "updated_at": 0.0,
+        })
+        stats["calls"] += 1
+        stats["updated_at"] = time.time()
+        if not success:
+            stats["failures"] += 1
+        stats["latency_ewma"] += self.alpha * (latency - stats["latency_ewma"])
+        stats["error_rate"] += self.alpha * ((0.0 if success else 1.0) - stats["error_rate"])
+        stats["cost_total"] += cost
+    
+    def record_usage(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0):
+        """Record token usage reported by the provider for a single completion"""
+        usage = self.usage.setdefault(model, {
+            "completions": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cached_tokens": 0,
+        })
+        usage["completions"] += 1
+        usage["prompt_tokens"] += prompt_tokens
+        usage["completion_tokens"] += completion_tokens
+        usage["cached_tokens"] += cached_tokens
+    
+    def _retry_stats(self, model: str) -> Dict[str, float]:
+        return self.retries.setdefault(model, {
+            "retries": 0,
+            "hinted_retries": 0,
+            "wasted_retries": 0,
+            "successful_retries": 0,
+            "backoff_seconds": 0.0,
+        })
+    
+    def record_backoff(self, model: str, delay: float, hinted: bool):
+        """Record a backoff sleep before a retry"""
+        stats = self._retry_stats(model)
+        stats["retries"] += 1
+        stats["backoff_seconds"] += delay
+        if hinted:
+            stats["hinted_retries"] += 1
+    
+    def record_retry_outcome(self, model: str, wasted: bool):
+        """Record whether a retry attempt failed again (wasted) or succeeded"""
+        stats = self._retry_stats(model)
+        stats["wasted_retries" if wasted else "successful_retries"] += 1
+    
+    def latency(self, model: str) -> Optional[float]:
+        """Smoothed latency in seconds, or None if the model has not been used yet"""
+        stats = self.stats.get(model)
+        return stats["latency_ewma"] if stats else None
+    
+    def error_rate(self, model: str) -> float:
+        """Smoothed failure rate between 0 and 1"""
+        stats = self.stats.get(model)
+        return stats["error_rate"] if stats else 0.0
+    
+    def last_updated(self, model: str) -> Optional[float]:
+        """Wall-clock time of the model's most recent attempt"""
+        stats = self.stats.get(model)
+        return stats["updated_at"] if stats else None
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Copy of the current stats, safe to serialize"""
+        return {model: dict(stats) for model, stats in self.stats.items()}
+    
+    def retry_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Retry counts, wasted retries and total idle backoff time per model"""
+        return {model: dict(stats) for model, stats in self.retries.items()}
+    
+    def usage_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Token usage per model with the share of prompt tokens served from provider caches"""
+        return {
+            model: {
+                **usage,
+                "cached_ratio": round(usage["cached_tokens"] / usage["prompt_tokens"], 3) if usage["prompt_tokens"] else 0.0,
+            }
+            for model, usage in self.usage.items()
+        }
+
 class RobustLLMHandler:
     """
     Handles LLM calls with retry mechanism and fallback switching
@@ -25,10 +127,14 @@ class RobustLLMHandler:
         self.max_retries = 3
         self.base_delay = 2  # seconds
         self.max_delay = 30  # seconds
+        self.max_retry_after = 60  # longer server-requested waits switch provider instead
         
         # Initialize all available LLMs with fallback priority
         self.llm_providers = self._initialize_llm_providers()
         
+        # Per-model latency/error stats consumed by the model router
+        self.telemetry = ProviderTelemetry()
+        
     def _initialize_llm_providers(self) -> Dict[str, List[LLM]]:
         """Initialize all LLM providers with fallback chains"""
         
@@ -74,13 +180,17 @@ class RobustLLMHandler:
             "report_generation": [gemini_primary, openrouter_claude_1, gemini_secondary]
         }
     
-    def execute_with_fallback(self, agent_type: str, agent_function, *args, **kwargs) -> Any:
+    def execute_with_fallback(self, agent_type: str, agent_function, *args,
+                              fallback_chain: Optional[List[LLM]] = None,
+                              use_llm: Optional[Callable[[LLM], None]] = None, **kwargs) -> Any:
         """
         Execute agent function with retry + fallback mechanism
         
         Args:
             agent_type: Type of agent (e.g., 'profile_analysis')
             agent_function: The agent execution function
+            fallback_chain: Optional LLM order overriding the default chain (e.g. from the model router)
+            use_llm: Called with each LLM before it is tried, to point the agent at it
             *args, **kwargs: Arguments to pass to the agent function
             
         Returns:
@@ -89,7 +199,8 @@ class RobustLLMHandler:
         Raises:
             Exception: If all fallback options fail
         """
-        fallback_chain = self.llm_providers.get(agent_type, [])
+        if fallback_chain is None:
+            fallback_chain = self.llm_providers.get(agent_type, [])
         
         if not fallback_chain:
             logger.error(f"No fallback chain defined for agent type: {agent_type}")
@@ -104,10 +215,14 @@ class RobustLLMHandler:
             
             # Try this LLM with retry mechanism
             try:
-                result = self._execute_with_retry(llm, agent_function, *args, **kwargs)
+                result = self._execute_with_retry(llm, agent_function, *args, use_llm=use_llm, **kwargs)
                 logger.info(f"✅ {agent_type} succeeded with {llm_name}")
                 return result
                 
+            except CrewCancelledError:
+                logger.info(f"🛑 {agent_type} cancelled, skipping remaining providers")
+                raise
+                
             except Exception as e:
                 last_exception = e
                 logger.warning(f"❌ {agent_type} failed with {llm_name}: {str(e)}")
@@ -121,31 +236,46 @@ class RobustLLMHandler:
         logger.error(f"🚨 All LLM providers failed for {agent_type}")
         raise Exception(f"All LLM providers failed for {agent_type}. Last error: {str(last_exception)}")
     
-    def _execute_with_retry(self, llm: LLM, agent_function, *args, **kwargs) -> Any:
+    def _execute_with_retry(self, llm: LLM, agent_function, *args,
+                            use_llm: Optional[Callable[[LLM], None]] = None, **kwargs) -> Any:
         """Execute with exponential backoff retry mechanism"""
         
         # Update the agent's LLM before execution
-        if hasattr(agent_function, '__self__'):  # If it's a bound method
+        if use_llm is not None:
+            use_llm(llm)
+        elif hasattr(agent_function, '__self__'):  # If it's a bound method
             agent_function.__self__.llm = llm
         
         last_exception = None
         
+        model = getattr(llm, 'model', 'Unknown')
+        
         for attempt in range(self.max_retries):
+            check_cancelled()
             try:
                 # Execute the agent function
-                result = agent_function(*args, **kwargs)
+                with trace_span(f"attempt {attempt + 1}: {model}", "attempt", model=model, attempt=attempt + 1):
+                    result = agent_function(*args, **kwargs)
                 
                 if attempt > 0:
+                    self.telemetry.record_retry_outcome(model, wasted=False)
                     logger.info(f"✅ Succeeded on retry attempt {attempt + 1}")
                 
                 return result
                 
+            except CrewCancelledError:
+                raise
+                
             except Exception as e:
                 last_exception = e
                 
-                # Check if this is a retryable error
-                if not self._is_retryable_error(e):
-                    logger.info(f"Non-retryable error, switching to next LLM: {str(e)}")
+                if attempt > 0:
+                    self.telemetry.record_retry_outcome(model, wasted=True)
+                
+                # Classify by exception type, status code and message
+                error = classify_error(e)
+                if not error.retryable:
+                    logger.info(f"Non-retryable {error.kind.value} error (status {error.status_code}), switching to next LLM: {str(e)}")
                     raise e
                 
                 # If this is the last attempt, don't wait
@@ -153,46 +283,32 @@ class RobustLLMHandler:
                     logger.warning(f"Max retries ({self.max_retries}) reached")
                     raise e
                 
-                # Calculate delay with exponential backoff
-                delay = min(self.base_delay * (2 ** attempt), self.max_delay)
-                logger.info(f"Retry {attempt + 1}/{self.max_retries} after {delay}s delay...")
-                time.sleep(delay)
+                # A server asking for a long pause is better served by the next provider
+                if error.retry_after is not None and error.retry_after > self.max_retry_after:
+                    logger.info(f"Provider asked to wait {error.retry_after:.0f}s, switching to next LLM instead")
+                    raise e
+                
+                delay = self._backoff_delay(attempt, error)
+                self.telemetry.record_backoff(model, delay, hinted=error.retry_after is not None)
+                logger.info(
+                    f"Retry {attempt + 1}/{self.max_retries} after {delay:.1f}s "
+                    f"({error.kind.value}, {'server hint' if error.retry_after is not None else 'exponential backoff'})..."
+                )
+                with trace_span("backoff", "backoff", model=model, delay=round(delay, 2), kind=error.kind.value):
+                    sleep_unless_cancelled(delay)
         
         # This should never be reached due to the raise in the loop
         raise last_exception
     
-    def _is_retryable_error(self, error: Exception) -> bool:
-        """Determine if an error is worth retrying"""
-        error_str = str(error).lower()
-        
-        # Non-retryable errors (should switch to fallback LLM immediately)
-        non_retryable_indicators = [
-            "402",  # Payment Required - Credits exhausted
-            "401",  # Unauthorized - Invalid API key
-            "403",  # Forbidden - Access denied
-            "credits",  # OpenRouter credits exhausted
-            "afford",   # OpenRouter can't afford tokens
-            "upgrade to a paid account",  # OpenRouter payment required
-        ]
-        
-        # If it's a non-retryable error, don't retry - switch LLM immediately
-        if any(indicator in error_str for indicator in non_retryable_indicators):
-            return False
-        
-        # Retryable errors (temporary issues)
-        retryable_indicators = [
-            "503",  # Service Unavailable
-            "502",  # Bad Gateway  
-            "504",  # Gateway Timeout
-            "429",  # Too Many Requests
-            "overloaded",
-            "timeout",
-            "temporarily unavailable",
-            "rate limit",
-            "internal server error"
-        ]
-        
-        return any(indicator in error_str for indicator in retryable_indicators)
+    def _backoff_delay(self, attempt: int, error: ProviderError) -> float:
+        """Seconds to wait before the next attempt"""
+        if error.retry_after is not None:
+            # Follow the server's hint, plus a little jitter so parallel retries don't align
+            return error.retry_after + random.uniform(0, min(1.0, error.retry_after * 0.1))
+        
+        # No hint: exponential backoff with jitter
+        delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+        return random.uniform(delay / 2, delay)
     
     def _get_llm_name(self, llm: LLM) -> str:
         """Get friendly name for LLM for logging"""
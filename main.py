@@ -5,10 +5,23 @@ import warnings
 warnings.filterwarnings('ignore')
 
 import os
+import argparse
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew, Process, LLM
+from crewai.tasks.task_output import TaskOutput
 from crewai_tools import SerperDevTool
 from llm_handler import llm_handler
+from model_router import model_router
+from knowledge_index import CareerKnowledgeTool
+from semantic_cache import task_output_cache, split_name, anonymize, personalize
+from cancellation import CrewCancelledError, check_cancelled, is_cancelled
+from output_budgets import (
+    OUTPUT_MODE, load_output_budgets, configure_task_output, with_output_budget, task_metrics,
+    effective_output_budget, estimate_tokens
+)
+import prompt_cache  # noqa: F401 - registers the LLM call listener (telemetry, usage, trace spans)
+from degraded_mode import degraded_engine
+from tracing import Trace, trace_span, tracing_scope, begin_task, end_task, finish_trace
 
 # Load environment variables from .env file
 load_dotenv()
@@ -61,9 +74,27 @@ openrouter_claude_2 = LLM(
 # Agent 7 (Report Generation): Gemini Primary
 # 
 # Distribution: Gemini(3) + Perplexity(2) + OpenRouter(2) = Perfect Balance!
+#
+# These are the defaults only - at kickoff model_router.py re-routes each agent
+# to a fast/balanced/strong tier based on task type, input size and telemetry.
+
+class CancellableSerperDevTool(SerperDevTool):
+    """Serper search that is skipped once the current crew run has been cancelled"""
+    
+    def _run(self, **kwargs):
+        # CrewAI retries a tool that raises and hands the error to the agent, so a cancelled
+        # run skips the search instead - the checkpoint before the next LLM call stops the task
+        if is_cancelled():
+            return "Search skipped: this request was cancelled."
+        return super()._run(**kwargs)
 
 # Initialize search tool
-search_tool = SerperDevTool()
+search_tool = CancellableSerperDevTool()
+
+# Local precompiled career/skills index - checked before the web for standard facts
+knowledge_tool = CareerKnowledgeTool()
+
+KNOWLEDGE_FIRST = " Check the Career Knowledge Base tool first for standard facts (typical skills, salary bands, well-known courses and certifications) and only use web search for information it does not cover."
 
 # --- Agent Definitions ---
 # 🎯 LLM Distribution Strategy - Using ALL 5 API Providers:
@@ -89,7 +120,7 @@ career_exploration_agent = Agent(
     backstory="You are a seasoned career counselor with deep knowledge of various industries, job roles, educational requirements, and future market trends. You can tailor your advice perfectly for a high-school student exploring their first career or a professional looking for a significant change.",
     verbose=True,
     allow_delegation=True,
-    tools=[search_tool],
+    tools=[knowledge_tool, search_tool],
     llm=perplexity_llm
 )
 
@@ -100,7 +131,7 @@ skill_development_agent = Agent(
     backstory="You are an expert in corporate and academic learning & development. You are constantly updated on the most effective online courses, certifications, and resources for professional growth across all domains.",
     verbose=True,
     allow_delegation=True,
-    tools=[search_tool],
+    tools=[knowledge_tool, search_tool],
     llm=openrouter_claude_1
 )
 
@@ -111,7 +142,7 @@ job_market_agent = Agent(
     backstory="You are a market research analyst specializing in labor trends and economic forecasting. You provide realistic and data-driven insights into various industries to help users make informed decisions.",
     verbose=True,
     allow_delegation=True,
-    tools=[search_tool],
+    tools=[knowledge_tool, search_tool],
     llm=perplexity_llm
 )
 
@@ -133,7 +164,7 @@ learning_resource_agent = Agent(
     backstory="You are an education technology specialist and learning curator with deep knowledge of online learning platforms, certification programs, bootcamps, and educational trends. You stay updated on the latest courses, their quality ratings, instructor credentials, and industry recognition. You can recommend both free and paid resources that provide the best ROI for career advancement.",
     verbose=True,
     allow_delegation=True,
-    tools=[search_tool],
+    tools=[knowledge_tool, search_tool],
     llm=openrouter_claude_2
 )
 
@@ -148,17 +179,22 @@ report_generation_agent = Agent(
 )
 
 # --- Task Definitions ---
+# Task prompts keep all static instructions first and per-request data last,
+# so providers with automatic prefix caching can reuse it (see prompt_cache.py)
+
+# Per-request data, appended after all static task instructions
+USER_INFO_SUFFIX = "\n\nUser information:\n{user_info}"
 
 # Task 1: Profile Analysis
 profile_analysis_task = Task(
-    description="Analyze the user's provided information: {user_info}. Create a structured summary that includes their current educational/professional stage, key interests, existing skills, and stated goals. If the user seems uncertain or provides minimal information (common for high school students), be encouraging and help identify potential strengths, interests, and opportunities based on what they've shared. Look for clues in their interests, achievements, or even subjects they might enjoy.",
+    description="Analyze the user's provided information (given at the end). Create a structured summary that includes their current educational/professional stage, key interests, existing skills, and stated goals. If the user seems uncertain or provides minimal information (common for high school students), be encouraging and help identify potential strengths, interests, and opportunities based on what they've shared. Look for clues in their interests, achievements, or even subjects they might enjoy.",
     expected_output="A clean markdown summary of the user's complete profile that is encouraging and identifies potential even when the user is uncertain about their direction.",
     agent=user_profiler_agent,
 )
 
 # Task 2: Career Path Exploration
 career_exploration_task = Task(
-    description="Using the user profile summary, research and identify 3 to 5 potential career paths that align with the user's interests and current stage. For each path, describe the role, typical day-to-day responsibilities, and future prospects. Make sure your advice is tailored to the user's specific situation (student vs. professional).",
+    description="Using the user profile summary, research and identify 3 to 5 potential career paths that align with the user's interests and current stage. For each path, describe the role, typical day-to-day responsibilities, and future prospects. Make sure your advice is tailored to the user's specific situation (student vs. professional)." + KNOWLEDGE_FIRST,
     expected_output="A detailed markdown section listing and describing the recommended career paths with pros and cons for each.",
     agent=career_exploration_agent,
     context=[profile_analysis_task],
@@ -166,7 +202,7 @@ career_exploration_task = Task(
 
 # Task 3: Skill Development Roadmap
 skill_development_task = Task(
-    description="For the career paths identified previously, research the essential technical and soft skills required to succeed. Create a skill development roadmap. For each skill, recommend 1-2 high-quality online courses (e.g., from Coursera, edX), certifications, or seminal books. You MUST provide direct links to these resources.",
+    description="For the career paths identified previously, research the essential technical and soft skills required to succeed. Create a skill development roadmap. For each skill, recommend 1-2 high-quality online courses (e.g., from Coursera, edX), certifications, or seminal books. You MUST provide direct links to these resources." + KNOWLEDGE_FIRST,
     expected_output="A markdown section formatted as an actionable skill-development plan, with skills grouped by their corresponding career path and including hyperlinks to learning resources.",
     agent=skill_development_agent,
     context=[career_exploration_task],
@@ -174,7 +210,7 @@ skill_development_task = Task(
 
 # Task 4: Job Market Analysis
 job_market_analysis_task = Task(
-    description="For each recommended career path, gather current job market data. Include typical salary ranges for entry-level, mid-level, and senior roles. List 3-5 top companies that are currently hiring for these positions. Provide a realistic outlook for these roles over the next 5 years.",
+    description="For each recommended career path, gather current job market data. Include typical salary ranges for entry-level, mid-level, and senior roles. List 3-5 top companies that are currently hiring for these positions. Provide a realistic outlook for these roles over the next 5 years." + KNOWLEDGE_FIRST,
     expected_output="A data-driven markdown section detailing job market insights, including salary data, key employers, and future demand for each suggested career.",
     agent=job_market_agent,
     context=[career_exploration_task],
@@ -190,7 +226,7 @@ roadmap_strategy_task = Task(
 
 # Task 6: Learning Resource Curation
 learning_resource_task = Task(
-    description="Research and curate the most current and high-quality learning resources for the identified career paths and required skills. Find specific courses, bootcamps, certifications, books, and learning platforms. Include both free and paid options, duration estimates, difficulty levels, and industry recognition. Provide direct links and enrollment information.",
+    description="Research and curate the most current and high-quality learning resources for the identified career paths and required skills. Find specific courses, bootcamps, certifications, books, and learning platforms. Include both free and paid options, duration estimates, difficulty levels, and industry recognition. Provide direct links and enrollment information." + KNOWLEDGE_FIRST,
     expected_output="A comprehensive markdown section with categorized learning resources including course details, links, costs, duration, and recommendations for different learning styles and budgets.",
     agent=learning_resource_agent,
     context=[career_exploration_task, skill_development_task, roadmap_strategy_task],
@@ -204,6 +240,9 @@ report_synthesis_task = Task(
     context=[profile_analysis_task, career_exploration_task, skill_development_task, job_market_analysis_task, roadmap_strategy_task, learning_resource_task],
 )
 
+# Upstream tasks whose outputs may be reused for near-duplicate profiles, in dependency order
+SEMANTIC_CACHE_TASKS = ["profile_analysis", "career_exploration"]
+
 # --- Robust Crew Definition with Error Handling ---
 class RobustCareerAdvisorCrew:
     """Career Advisor Crew with robust error handling and fallback mechanisms"""
@@ -239,37 +278,170 @@ class RobustCareerAdvisorCrew:
             learning_resource_task: "learning_resources",
             report_synthesis_task: "report_generation"
         }
+        self.role_agent_mapping = {
+            agent.role: self.task_agent_mapping[task] for task, agent in zip(self.tasks, self.agents)
+        }
+        
+        # Completion-token caps per task, and compact JSON for intermediate tasks
+        self.output_budgets = load_output_budgets()
+        for task in self.tasks:
+            configure_task_output(task, self.task_agent_mapping[task])
+        profile_analysis_task.description += USER_INFO_SUFFIX
         
         self.crew = Crew(
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
             verbose=True,
-            memory=False
+            memory=False,
+            step_callback=self._on_step,  # Stop between agent steps once cancelled
+            task_callback=self._on_task_complete
         )
     
-    def kickoff(self, inputs: dict):
+    def kickoff(self, inputs: dict, endpoint: str = "default", fast_mode: bool = None):
         """Execute crew with robust error handling"""
         try:
             print("🚀 Starting AI Career Advisor with robust error handling...")
             print("📊 System configured with 5 API providers and intelligent fallback")
             
+            # Pick a model tier per agent for this request
+            with trace_span("routing", "phase", endpoint=endpoint):
+                self._apply_routing(inputs, endpoint, fast_mode)
+            
+            # Skip upstream tasks already answered for a near-duplicate profile
+            with trace_span("semantic_cache_lookup", "phase") as span:
+                self.reused_tasks = self._reuse_cached_outputs(inputs)
+                if span is not None:
+                    span.attrs["reused_tasks"] = self.reused_tasks
+            self.fresh_outputs = {}
+            task_metrics.mark()
+            
             # Execute with our robust error handling
             result = self._execute_with_fallback(inputs)
+            with trace_span("semantic_cache_store", "phase"):
+                self._store_cached_outputs(inputs)
             return result
             
+        except CrewCancelledError:
+            print("🛑 Career analysis cancelled - stopping all agents")
+            raise
+            
         except Exception as e:
             print(f"❌ Critical error in career advisor: {e}")
             return self._generate_emergency_fallback(inputs)
     
+    def _apply_routing(self, inputs: dict, endpoint: str, fast_mode: bool):
+        """Route every agent to the model tier chosen by the routing policy"""
+        input_size = len(str(inputs.get('user_info', '')))
+        self.routes = {}
+        
+        for task, agent in zip(self.tasks, self.agents):
+            agent_type = self.task_agent_mapping[task]
+            chain = model_router.route(agent_type, input_size, endpoint, fast_mode)
+            self.routes[agent_type] = chain
+            agent.llm = self._budgeted_llm(agent_type, chain[0])
+    
+    def _budgeted_llm(self, agent_type: str, llm: LLM) -> LLM:
+        """`llm` with the task's output budget applied"""
+        return with_output_budget(llm, effective_output_budget(llm.model, self.output_budgets.get(agent_type)))
+    
+    def _on_step(self, step):
+        """Step callback: honour cancellation between agent steps"""
+        check_cancelled()
+    
+    def _on_task_complete(self, output):
+        """Task callback: record output/context size and duration, then honour cancellation"""
+        agent_type = self.role_agent_mapping.get(output.agent, output.agent)
+        task = next((t for t, a in self.task_agent_mapping.items() if a == agent_type), None)
+        model = getattr(getattr(task, 'agent', None), 'llm', None)
+        budget = effective_output_budget(getattr(model, 'model', None), self.output_budgets.get(agent_type))
+        task_metrics.record(agent_type, output.raw, budget, OUTPUT_MODE, self._context_tokens(task, output))
+        end_task(output_chars=len(output.raw or ""))
+        self._begin_next_task()
+        check_cancelled()
+    
+    def _context_tokens(self, task, output) -> int:
+        """Estimated prompt context a task received: its description plus its upstream task outputs"""
+        context = getattr(task, 'context', None)
+        upstream = [t.output.raw for t in context if t.output is not None] if isinstance(context, list) else []
+        return estimate_tokens(output.description or "") + sum(estimate_tokens(raw or "") for raw in upstream)
+    
+    def _begin_trace_task(self, agent_type: str):
+        """Open the trace span for a task (no-op unless the run is traced)"""
+        chain = getattr(self, 'routes', {}).get(agent_type)
+        begin_task(agent_type, model=getattr(chain[0], 'model', None) if chain else None)
+    
+    def _begin_next_task(self):
+        """Sequential crews give no task-start hook, so the next span opens when the previous task ends"""
+        if getattr(self, '_upcoming_tasks', None):
+            self._begin_trace_task(self._upcoming_tasks.pop(0))
+    
+    def _reuse_cached_outputs(self, inputs: dict) -> int:
+        """Attach cached outputs to the leading upstream tasks; returns how many were reused"""
+        name, profile_text = split_name(inputs.get('user_info', ''))
+        cached = task_output_cache.get(profile_text)
+        if not cached:
+            return 0
+        cached = personalize(cached, name)
+        
+        reused = 0
+        for task, agent in zip(self.tasks, self.agents):
+            agent_type = self.task_agent_mapping[task]
+            if agent_type not in SEMANTIC_CACHE_TASKS or agent_type not in cached:
+                break
+            # Downstream tasks read their context from task.output
+            task.output = TaskOutput(
+                description=task.description,
+                raw=cached[agent_type],
+                agent=agent.role
+            )
+            reused += 1
+        
+        if reused:
+            print(f"♻️  Reusing {reused} cached upstream task output(s) from a similar profile")
+        return reused
+    
+    def _store_cached_outputs(self, inputs: dict):
+        """Cache the upstream outputs produced by this run"""
+        outputs = {
+            agent_type: output
+            for agent_type, output in self.fresh_outputs.items()
+            if agent_type in SEMANTIC_CACHE_TASKS
+        }
+        if outputs:
+            name, profile_text = split_name(inputs.get('user_info', ''))
+            task_output_cache.put(profile_text, anonymize(outputs, name))
+    
     def _execute_with_fallback(self, inputs: dict):
         """Execute crew tasks with individual task error handling"""
         try:
             # Use standard crew execution first
-            result = self.crew.kickoff(inputs=inputs)
+            if self.reused_tasks:
+                crew = Crew(
+                    agents=self.agents,
+                    tasks=self.tasks[self.reused_tasks:],
+                    process=Process.sequential,
+                    verbose=True,
+                    memory=False,
+                    step_callback=self._on_step,
+                    task_callback=self._on_task_complete
+                )
+            else:
+                crew = self.crew
+            self._upcoming_tasks = [self.task_agent_mapping[task] for task in self.tasks[self.reused_tasks:]]
+            self._begin_next_task()
+            result = crew.kickoff(inputs=inputs)
+            
+            for task in self.tasks[self.reused_tasks:]:
+                if task.output is not None:
+                    self.fresh_outputs[self.task_agent_mapping[task]] = task.output.raw
             return result
             
+        except CrewCancelledError:
+            raise
+            
         except Exception as e:
+            end_task(error=type(e).__name__)
             print(f"⚠️  Standard execution failed: {e}")
             print("🔄 Switching to individual task execution with fallbacks...")
             
@@ -279,12 +451,20 @@ class RobustCareerAdvisorCrew:
     def _execute_tasks_individually(self, inputs: dict):
         """Execute each task individually with fallback LLM switching"""
         results = []
+        self._upcoming_tasks = []
         
         for i, (task, agent) in enumerate(zip(self.tasks, self.agents)):
             agent_type = self.task_agent_mapping[task]
             
+            if i < self.reused_tasks:
+                results.append(task.output.raw)
+                print(f"♻️  {agent.role} reused from semantic cache")
+                continue
+            
             try:
                 print(f"\n🤖 Executing {agent.role} ({i+1}/{len(self.tasks)})...")
+                task_metrics.mark()
+                self._begin_trace_task(agent_type)
                 
                 # Create a simple execution function for this task
                 def execute_task():
@@ -293,20 +473,34 @@ class RobustCareerAdvisorCrew:
                         agents=[agent],
                         tasks=[task],
                         process=Process.sequential,
-                        verbose=1
+                        verbose=1,
+                        step_callback=self._on_step,
+                        task_callback=self._on_task_complete
                     )
                     return single_crew.kickoff(inputs=inputs)
                 
+                # Point the agent at each LLM the handler tries
+                def use_llm(llm):
+                    agent.llm = self._budgeted_llm(agent_type, llm)
+                
                 # Execute with fallback handling
                 result = llm_handler.execute_with_fallback(
                     agent_type=agent_type,
-                    agent_function=execute_task
+                    agent_function=execute_task,
+                    fallback_chain=getattr(self, 'routes', {}).get(agent_type),
+                    use_llm=use_llm
                 )
                 
+                end_task()
                 results.append(result)
+                self.fresh_outputs[agent_type] = str(result)
                 print(f"✅ {agent.role} completed successfully")
                 
+            except CrewCancelledError:
+                raise
+                
             except Exception as e:
+                end_task(error=type(e).__name__, fallback=True)
                 print(f"❌ {agent.role} failed completely: {e}")
                 # Add fallback content for this agent
                 fallback_result = self._get_fallback_content(agent_type, inputs)
@@ -318,111 +512,11 @@ class RobustCareerAdvisorCrew:
     
     def _get_fallback_content(self, agent_type: str, inputs: dict) -> str:
         """Generate fallback content when all LLMs fail for an agent"""
-        user_info = inputs.get('user_info', 'User information not provided')
-        
-        fallback_templates = {
-            "profile_analysis": f"""
-# User Profile Analysis
-
-Based on the provided information: {user_info[:200]}...
-
-**Note**: Our AI analysis system is currently experiencing high demand. This is a basic profile analysis.
-
-## Summary
-The user appears to be seeking career guidance and has provided initial information about their background and interests.
-
-## Recommendations
-1. Explore interests through online resources and courses
-2. Connect with career counselors or mentors
-3. Research various career paths related to stated interests
-4. Consider internships or volunteer opportunities
-
-*A complete AI analysis will be available shortly.*
-            """,
-            
-            "career_exploration": """
-# Career Path Recommendations
-
-**Note**: Using general career guidance while our AI completes your personalized analysis.
-
-## Popular Career Paths for Students
-1. **Technology Sector**: Software development, data science, cybersecurity
-2. **Healthcare**: Medicine, nursing, physical therapy, mental health
-3. **Business**: Marketing, finance, project management, entrepreneurship
-4. **Creative Fields**: Design, writing, media production, arts
-5. **Education**: Teaching, training, educational administration
-
-## Next Steps
-- Research specific roles in your areas of interest
-- Connect with professionals in these fields
-- Explore relevant educational programs
-
-*Personalized recommendations based on your profile coming soon.*
-            """,
-            
-            "skill_development": """
-# Skill Development Roadmap
-
-**Note**: General skill recommendations while our AI analyzes your specific needs.
-
-## Core Skills for Career Success
-1. **Communication**: Written and verbal communication
-2. **Problem-solving**: Critical thinking and analytical skills
-3. **Technology**: Basic computer skills and digital literacy
-4. **Leadership**: Teamwork and project management
-5. **Adaptability**: Learning agility and flexibility
-
-## Learning Resources
-- Online platforms: Coursera, edX, Khan Academy, YouTube
-- Professional certifications in your field of interest
-- Books and industry publications
-- Workshops and networking events
-
-*Tailored skill development plan coming soon.*
-            """,
-            
-            "market_analysis": """
-# Job Market Analysis
-
-**Note**: Using current market data while our AI completes detailed analysis.
-
-## Current Job Market Trends
-- Technology roles showing strong growth
-- Healthcare experiencing high demand
-- Remote work opportunities expanding
-- Skills-based hiring increasing
-
-## Salary Expectations
-- Entry-level: $35,000 - $55,000 depending on field
-- Mid-level: $55,000 - $85,000 with experience
-- Senior-level: $85,000+ with specialization
-
-*Detailed market analysis for your specific interests coming soon.*
-            """,
-            
-            "learning_resources": """
-# Learning Resources & Recommendations
-
-**Note**: Curated resources while our AI personalizes recommendations.
-
-## Popular Learning Platforms
-1. **Coursera**: University courses and professional certificates
-2. **edX**: Academic courses from top universities
-3. **Khan Academy**: Free courses on various subjects
-4. **LinkedIn Learning**: Professional skill development
-5. **YouTube**: Free tutorials and educational content
-
-## Certification Programs
-- Google Career Certificates
-- Microsoft Certifications
-- AWS Cloud Certifications
-- Adobe Creative Certifications
-
-*Personalized learning path coming soon.*
-            """
-        }
+        user_info = inputs.get('user_info', '')
         
-        return fallback_templates.get(agent_type, f"Fallback content for {agent_type} - Full analysis coming soon.")
+        # Personalized stand-in built locally from the user's keywords
+        content = degraded_engine.section(agent_type, user_info)
+        return content or f"Fallback content for {agent_type} - Full analysis coming soon."
     
     def _combine_results(self, results: list) -> str:
         """Combine individual task results into final report"""
@@ -451,42 +545,7 @@ Some sections may use cached data due to high system demand, ensuring you always
     
     def _generate_emergency_fallback(self, inputs: dict) -> str:
         """Last resort fallback when everything fails"""
-        user_info = inputs.get('user_info', 'No information provided')
-        
-        return f"""
-# 🚨 Career Guidance Report (Emergency Mode)
-
-Dear User,
-
-Our AI system is currently experiencing technical difficulties, but we don't want to leave you empty-handed!
-
-## Your Information
-{user_info}
-
-## General Career Guidance
-
-1. **Explore Your Interests**: Take time to identify what truly excites you
-2. **Research Career Options**: Use online resources like O*NET, Bureau of Labor Statistics
-3. **Develop Skills**: Focus on both technical and soft skills
-4. **Network**: Connect with professionals in fields of interest
-5. **Gain Experience**: Look for internships, volunteer work, or part-time jobs
-
-## Immediate Next Steps
-- Schedule a meeting with a school counselor
-- Take online career assessment tests
-- Join clubs or activities related to your interests
-- Research colleges or training programs
-
-## Resources
-- Career assessment tools: 16Personalities, StrengthsFinder
-- Job research: LinkedIn, Glassdoor, Indeed
-- Skill building: Khan Academy, Coursera, YouTube
-
-**We apologize for the technical difficulties. Please try again later for your full AI-powered career analysis.**
-
-Best regards,
-The AI Career Advisor Team
-        """
+        return degraded_engine.render(inputs.get('user_info', ''))
 
 # Create the robust crew instance
 career_advisor_crew = RobustCareerAdvisorCrew()
@@ -494,6 +553,13 @@ career_advisor_crew = RobustCareerAdvisorCrew()
 # --- Main Execution ---
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI Career Advisor")
+    parser.add_argument(
+        "--trace", nargs="?", const="career_trace.json", metavar="PATH",
+        help="Profile the run: write a Chrome trace (default career_trace.json) and print a critical-path summary"
+    )
+    args = parser.parse_args()
+    
     print("🎯 Welcome to the AI Career Advisor!")
     print("=" * 50)
     print("I'll help you discover your ideal career path with personalized guidance.")
@@ -518,8 +584,14 @@ if __name__ == "__main__":
             "user_info": user_info
         }
         
-        # Kick off the crew
-        result = career_advisor_crew.kickoff(inputs=inputs)
+        # Kick off the crew, recording a span tree when --trace is given
+        trace = Trace("career_report", source="cli") if args.trace else None
+        try:
+            with tracing_scope(trace):
+                result = career_advisor_crew.kickoff(inputs=inputs)
+        finally:
+            if trace is not None:
+                finish_trace(trace, args.trace)
         
         # Print the result to console
         print("\n" + "=" * 60)
@@ -0,0 +1,176 @@
+# Tiered Model Routing Policy
+# Picks a fast, balanced or strong model per task on top of RobustLLMHandler.llm_providers
+
+import os
+import json
+import logging
+from typing import List, Dict, Any, Optional
+from crewai import LLM
+from llm_handler import llm_handler
+
+logger = logging.getLogger(__name__)
+
+# Tiers ordered from cheapest/fastest to strongest/slowest
+TIERS = ["fast", "balanced", "strong"]
+
+# Default policy - override any key with a JSON file pointed to by MODEL_ROUTING_POLICY
+DEFAULT_POLICY: Dict[str, Any] = {
+    # Which tier each model belongs to (matched as a substring of the LiteLLM model name)
+    "model_tiers": {
+        "gemini-2.0-flash": "fast",
+        "sonar-reasoning-pro": "balanced",
+        "deepseek-r1": "strong",
+    },
+    # Relative cost per call, used to break ties inside a tier
+    "model_costs": {
+        "gemini-2.0-flash": 1.0,
+        "sonar-reasoning-pro": 5.0,
+        "deepseek-r1": 3.0,
+    },
+    # Baseline tier per task type
+    "task_tiers": {
+        "profile_analysis": "fast",
+        "career_exploration": "balanced",
+        "skill_development": "fast",
+        "market_analysis": "balanced",
+        "roadmap_strategy": "strong",
+        "learning_resources": "fast",
+        "report_generation": "fast",
+    },
+    # Inputs longer than this (characters) are bumped up one tier
+    "large_input_chars": 4000,
+    # Step a task down one tier when its preferred models are slower than this (seconds)
+    "latency_budget": 90.0,
+    # Skip models whose smoothed error rate is above this
+    "max_error_rate": 0.5,
+    # Per-endpoint overrides: {"fast_mode": bool, "max_tier": str}
+    "endpoints": {
+        "default": {"fast_mode": False, "max_tier": "strong"},
+        "preview": {"fast_mode": True, "max_tier": "fast"},
+    },
+}
+
+
+class ModelRouter:
+    """
+    Routing policy layer that orders each agent's LLM fallback chain by tier.
+    The tier comes from the task type, the input size, the endpoint profile
+    and the live latency/error telemetry collected by RobustLLMHandler.
+    """
+
+    def __init__(self, handler=llm_handler, policy: Optional[Dict[str, Any]] = None):
+        self.handler = handler
+        self.policy = policy if policy is not None else self._load_policy()
+
+    def _load_policy(self) -> Dict[str, Any]:
+        """Load the routing policy, merging an optional JSON file over the defaults"""
+        policy = json.loads(json.dumps(DEFAULT_POLICY))
+        path = os.getenv("MODEL_ROUTING_POLICY", "routing_policy.json")
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    overrides = json.load(f)
+                for key, value in overrides.items():
+                    if isinstance(value, dict) and isinstance(policy.get(key), dict):
+                        policy[key].update(value)
+                    else:
+                        policy[key] = value
+                logger.info(f"Loaded model routing policy from {path}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring invalid routing policy {path}: {e}")
+
+        return policy
+
+    def model_tier(self, llm: LLM) -> str:
+        """Tier of a configured LLM, defaulting to 'balanced' for unknown models"""
+        model = getattr(llm, 'model', '')
+        for pattern, tier in self.policy["model_tiers"].items():
+            if pattern in model:
+                return tier
+        return "balanced"
+
+    def model_cost(self, llm: LLM) -> float:
+        model = getattr(llm, 'model', '')
+        for pattern, cost in self.policy["model_costs"].items():
+            if pattern in model:
+                return cost
+        return 1.0
+
+    def select_tier(self, agent_type: str, input_size: int = 0,
+                    endpoint: str = "default", fast_mode: Optional[bool] = None) -> str:
+        """Pick the target tier for one task"""
+        profile = self.policy["endpoints"].get(endpoint, self.policy["endpoints"]["default"])
+        if fast_mode is None:
+            fast_mode = profile.get("fast_mode", False)
+        if fast_mode:
+            return "fast"
+
+        tier_index = TIERS.index(self.policy["task_tiers"].get(agent_type, "balanced"))
+
+        # Big inputs need more capable models
+        if input_size > self.policy["large_input_chars"]:
+            tier_index += 1
+
+        # Step down when every model of the chosen tier is over the latency budget
+        candidates = self._candidates(agent_type)
+        tier_latencies = [
+            self.handler.telemetry.latency(getattr(llm, 'model', ''))
+            for llm in candidates
+            if self.model_tier(llm) == TIERS[min(tier_index, len(TIERS) - 1)]
+        ]
+        if tier_latencies and all(
+            latency is not None and latency > self.policy["latency_budget"]
+            for latency in tier_latencies
+        ):
+            tier_index -= 1
+
+        max_index = TIERS.index(profile.get("max_tier", "strong"))
+        return TIERS[max(0, min(tier_index, max_index))]
+
+    def _candidates(self, agent_type: str) -> List[LLM]:
+        """The agent's own fallback chain followed by every other configured LLM"""
+        seen = []
+        chains = [self.handler.llm_providers.get(agent_type, [])] + list(self.handler.llm_providers.values())
+        for chain in chains:
+            for llm in chain:
+                if not any(llm is other for other in seen):
+                    seen.append(llm)
+        return seen
+
+    def route(self, agent_type: str, input_size: int = 0,
+              endpoint: str = "default", fast_mode: Optional[bool] = None) -> List[LLM]:
+        """
+        Build the ordered LLM chain for a task
+
+        Models of the target tier come first (cheapest and fastest first), then
+        the remaining models ordered by their distance from the target tier.
+        Unhealthy models are moved to the end rather than dropped.
+        """
+        tier = self.select_tier(agent_type, input_size, endpoint, fast_mode)
+        target = TIERS.index(tier)
+        telemetry = self.handler.telemetry
+        candidates = self._candidates(agent_type)
+
+        def sort_key(item):
+            position, llm = item
+            model = getattr(llm, 'model', '')
+            unhealthy = telemetry.error_rate(model) > self.policy["max_error_rate"]
+            latency = telemetry.latency(model)
+            return (
+                unhealthy,
+                abs(TIERS.index(self.model_tier(llm)) - target),
+                self.model_cost(llm),
+                latency if latency is not None else 0.0,
+                position,
+            )
+
+        chain = [llm for _, llm in sorted(enumerate(candidates), key=sort_key)]
+        logger.info(
+            f"Routing {agent_type} to tier '{tier}': "
+            f"{', '.join(self.handler._get_llm_name(llm) for llm in chain)}"
+        )
+        return chain
+
+# Global instance
+model_router = ModelRouter()
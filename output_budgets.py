@@ -0,0 +1,197 @@
+# Output-Length Budgets and Structured Intermediate Outputs
+# Caps completion tokens per task and lets intermediate tasks emit compact JSON instead of long markdown
+
+import os
+import json
+import time
+import threading
+import logging
+from typing import Dict, Any, Optional
+from crewai import LLM
+
+logger = logging.getLogger(__name__)
+
+# "structured": intermediate tasks return compact JSON, "markdown": original long-form sections
+OUTPUT_MODE = os.getenv("OUTPUT_MODE", "structured")
+
+# Completion-token cap per task - override with OUTPUT_BUDGETS='{"skill_development": 600}'
+DEFAULT_OUTPUT_BUDGETS = {
+    "profile_analysis": 500,
+    "career_exploration": 900,
+    "skill_development": 900,
+    "market_analysis": 700,
+    "roadmap_strategy": 1000,
+    "learning_resources": 900,
+    "report_generation": 1800,
+}
+
+# Reasoning models spend completion tokens on their hidden reasoning before the answer,
+# so a task-sized cap truncates them - they run uncapped (matched as a substring of the model name)
+REASONING_MODELS = ("deepseek-r1", "sonar-reasoning")
+
+# Compact schemas for intermediate tasks. The final report stays markdown.
+STRUCTURED_OUTPUT_SCHEMAS = {
+    "profile_analysis": {
+        "stage": "string", "interests": ["string"], "skills": ["string"],
+        "goals": ["string"], "strengths": ["string"], "notes": "string (one sentence)",
+    },
+    "career_exploration": {
+        "careers": [{"title": "string", "why_fit": "string", "day_to_day": "string",
+                     "outlook": "string", "pros": ["string"], "cons": ["string"]}],
+    },
+    "skill_development": {
+        "skills_by_career": [{"career": "string", "skills": [{"name": "string", "type": "technical|soft",
+                              "resources": [{"title": "string", "url": "string"}]}]}],
+    },
+    "market_analysis": {
+        "markets": [{"career": "string", "salary": {"entry": "string", "mid": "string", "senior": "string"},
+                     "top_employers": ["string"], "outlook_5y": "string"}],
+    },
+    "roadmap_strategy": {
+        "phases": [{"name": "string", "timeframe": "string", "milestones": ["string"], "actions": ["string"]}],
+        "networking": ["string"], "decision_points": ["string"],
+    },
+    "learning_resources": {
+        "resources": [{"title": "string", "url": "string", "type": "course|certification|book|bootcamp|platform",
+                       "cost": "string", "duration": "string", "level": "string", "for_skill": "string"}],
+    },
+}
+
+STRUCTURED_INSTRUCTION = (
+    " Respond ONLY with compact minified JSON matching this schema, with no markdown, prose or code fences."
+    " Keep every string short (under 25 words): {schema}"
+)
+
+
+def load_output_budgets() -> Dict[str, int]:
+    """Default budgets merged with the OUTPUT_BUDGETS environment override"""
+    budgets = dict(DEFAULT_OUTPUT_BUDGETS)
+    overrides = os.getenv("OUTPUT_BUDGETS")
+    if overrides:
+        try:
+            budgets.update({key: int(value) for key, value in json.loads(overrides).items()})
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring invalid OUTPUT_BUDGETS: {e}")
+    return budgets
+
+
+def is_reasoning_model(model: Optional[str]) -> bool:
+    return bool(model) and any(pattern in model for pattern in REASONING_MODELS)
+
+
+def effective_output_budget(model: Optional[str], budget: Optional[int]) -> Optional[int]:
+    """The task's budget, or None for reasoning models"""
+    return None if is_reasoning_model(model) else budget
+
+
+def configure_task_output(task, agent_type: str, mode: str = OUTPUT_MODE):
+    """Switch an intermediate task to compact JSON output when structured mode is on"""
+    schema = STRUCTURED_OUTPUT_SCHEMAS.get(agent_type)
+    if mode != "structured" or schema is None:
+        return
+
+    task.description += STRUCTURED_INSTRUCTION.format(schema=json.dumps(schema, separators=(",", ":")))
+    task.expected_output = f"Compact JSON object matching the schema for {agent_type.replace('_', ' ')}."
+
+
+_budgeted_llms: Dict[tuple, LLM] = {}
+_budgeted_llms_lock = threading.Lock()
+
+
+def _max_tokens_field(llm: LLM) -> str:
+    """Native Gemini clients only send max_output_tokens, everything else takes max_tokens"""
+    return "max_output_tokens" if "max_output_tokens" in type(llm).model_fields else "max_tokens"
+
+
+def with_output_budget(llm: LLM, max_tokens: Optional[int]) -> LLM:
+    """
+    Copy of `llm` capped at `max_tokens` completion tokens (copies are reused)
+    The copy keeps provider, endpoint and key - native clients strip the provider
+    prefix from llm.model, so rebuilding from the model name would change provider.
+    """
+    if not max_tokens:
+        return llm
+
+    key = (id(llm), max_tokens)
+    with _budgeted_llms_lock:
+        if key not in _budgeted_llms:
+            _budgeted_llms[key] = llm.model_copy(update={_max_tokens_field(llm): max_tokens})
+        return _budgeted_llms[key]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return max(1, len(text) // 4) if text else 0
+
+
+class TaskMetrics:
+    """
+    Per-task output size, prompt context size and duration, split by output mode,
+    so markdown and structured runs can be compared directly - including how much
+    smaller the prompts of downstream tasks get.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def mark(self):
+        """Start timing the next task in the current thread"""
+        self._local.started = time.monotonic()
+
+    def record(self, agent_type: str, output_text: str, budget: Optional[int], mode: str = OUTPUT_MODE,
+               context_tokens: int = 0):
+        """`context_tokens` is the task description plus the upstream outputs it received"""
+        started = getattr(self._local, "started", None)
+        duration = time.monotonic() - started if started is not None else 0.0
+        self.mark()
+
+        tokens = estimate_tokens(output_text)
+        is_json = False
+        if mode == "structured" and agent_type in STRUCTURED_OUTPUT_SCHEMAS:
+            try:
+                json.loads(output_text)
+                is_json = True
+            except ValueError:
+                pass
+
+        with self._lock:
+            stats = self.stats.setdefault(agent_type, {}).setdefault(mode, {
+                "runs": 0, "output_tokens_total": 0, "context_tokens_total": 0, "duration_total": 0.0,
+                "budget_hits": 0, "json_valid": 0,
+            })
+            stats["runs"] += 1
+            stats["output_tokens_total"] += tokens
+            stats["context_tokens_total"] += context_tokens
+            stats["duration_total"] += duration
+            if budget and tokens >= budget * 0.95:
+                stats["budget_hits"] += 1
+            if is_json:
+                stats["json_valid"] += 1
+
+        logger.info(
+            f"📏 {agent_type}: ~{context_tokens} context tokens in, ~{tokens} output tokens out "
+            f"in {duration:.1f}s ({mode}, budget {budget})"
+        )
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Averages per task and mode"""
+        with self._lock:
+            return {
+                agent_type: {
+                    mode: {
+                        "runs": stats["runs"],
+                        "avg_output_tokens": round(stats["output_tokens_total"] / stats["runs"]),
+                        "avg_context_tokens": round(stats["context_tokens_total"] / stats["runs"]),
+                        "avg_duration": round(stats["duration_total"] / stats["runs"], 2),
+                        "budget_hits": stats["budget_hits"],
+                        "json_valid": stats["json_valid"],
+                    }
+                    for mode, stats in modes.items()
+                }
+                for agent_type, modes in self.stats.items()
+            }
+
+# Global instance
+task_metrics = TaskMetrics()
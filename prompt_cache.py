@@ -0,0 +1,126 @@
+# Provider Prompt-Prefix Caching
+# Prompts keep the static agent/task text first (see USER_INFO_SUFFIX in main.py), which is all
+# the configured providers need: DeepSeek (via OpenRouter) caches repeated prefixes automatically,
+# Gemini 2.0 Flash only caches explicitly above a 4096-token prefix (agent prefixes are a few
+# hundred tokens) and Perplexity has no prompt caching. This module reports latency, errors and
+# token counts - including cached prompt tokens - of every LLM call into the handler telemetry,
+# and LLM and tool calls into the request trace when profiling is on
+
+import threading
+import logging
+from typing import Dict, Any, Optional, Tuple
+from crewai.events import BaseEventListener
+from crewai.events.types.llm_events import LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent
+from crewai.events.types.tool_usage_events import ToolUsageStartedEvent, ToolUsageFinishedEvent, ToolUsageErrorEvent
+from llm_handler import llm_handler
+from tracing import current_trace
+
+logger = logging.getLogger(__name__)
+
+
+def _usage_tokens(usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Prompt, completion and cached prompt tokens from a CrewAI usage dict (OpenAI or Gemini keys)"""
+    usage = usage or {}
+    return {
+        "prompt_tokens": int(usage.get("prompt_tokens") or usage.get("prompt_token_count") or 0),
+        "completion_tokens": int(usage.get("completion_tokens") or usage.get("candidates_token_count") or 0),
+        "cached_tokens": int(usage.get("cached_prompt_tokens") or 0),
+    }
+
+
+class LLMCallListener(BaseEventListener):
+    """
+    CrewAI event-bus listener feeding latency, success/failure and token usage of every
+    LLM call into the handler telemetry, and LLM and tool spans into the current trace.
+    The configured models run on CrewAI's native provider SDKs, which never reach
+    LiteLLM's callbacks, but every LLM class emits these events.
+    Handlers run with a copy of the emitting thread's context, so the trace is in scope.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        self._tool_starts: Dict[Tuple[int, Optional[str], str], float] = {}
+        self._lock = threading.Lock()
+        super().__init__()
+
+    def _pair(self, call_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """
+        Merge one half of a call into its entry; returns the entry once both halves arrived.
+        Handlers run on the event bus thread pool, so the end may be seen before the start.
+        """
+        with self._lock:
+            entry = self._calls.setdefault(call_id, {})
+            entry.update(fields)
+            if "start" in entry and "end" in entry:
+                return self._calls.pop(call_id)
+        return None
+
+    def _record(self, entry: Dict[str, Any]):
+        try:
+            latency = max(0.0, (entry["end"] - entry["start"]).total_seconds())
+            llm_handler.telemetry.record(entry["model"], latency, success=entry["success"])
+            tokens = _usage_tokens(entry.get("usage")) if entry["success"] else {}
+            if entry["success"]:
+                llm_handler.telemetry.record_usage(model=entry["model"], **tokens)
+
+            trace = entry.get("trace")
+            if trace is not None:
+                attrs = dict(tokens, model=entry["model"], messages=entry.get("messages", 0))
+                if not entry["success"]:
+                    attrs["error"] = entry.get("error", "unknown")
+                trace.add_leaf(entry["model"], "llm", entry["start"].timestamp(), entry["end"].timestamp(), **attrs)
+        except Exception as e:  # Telemetry must never break a completion
+            logger.debug(f"Could not record LLM call: {e}")
+
+    def _tool_key(self, event) -> Tuple[int, Optional[str], str]:
+        return (id(current_trace()), event.agent_role, event.tool_name)
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_started(source, event):
+            entry = self._pair(
+                event.call_id, start=event.timestamp, trace=current_trace(),
+                model=event.model or getattr(source, "model", "unknown"),
+                messages=len(event.messages) if isinstance(event.messages, list) else 1,
+            )
+            if entry:
+                self._record(entry)
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def on_completed(source, event):
+            entry = self._pair(event.call_id, end=event.timestamp, success=True, usage=event.usage)
+            if entry:
+                self._record(entry)
+
+        @crewai_event_bus.on(LLMCallFailedEvent)
+        def on_failed(source, event):
+            entry = self._pair(event.call_id, end=event.timestamp, success=False, error=event.error[:120])
+            if entry:
+                self._record(entry)
+
+        @crewai_event_bus.on(ToolUsageStartedEvent)
+        def on_tool_started(source, event):
+            if current_trace() is not None:
+                with self._lock:
+                    self._tool_starts[self._tool_key(event)] = event.timestamp.timestamp()
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event):
+            trace = current_trace()
+            if trace is not None:
+                with self._lock:
+                    self._tool_starts.pop(self._tool_key(event), None)
+                trace.add_leaf(event.tool_name, "tool", event.started_at.timestamp(), event.finished_at.timestamp(),
+                               from_cache=event.from_cache)
+
+        @crewai_event_bus.on(ToolUsageErrorEvent)
+        def on_tool_error(source, event):
+            trace = current_trace()
+            if trace is not None:
+                end = event.timestamp.timestamp()
+                with self._lock:
+                    start = self._tool_starts.pop(self._tool_key(event), end)
+                trace.add_leaf(event.tool_name, "tool", start, end, error=str(event.error)[:120])
+
+
+llm_call_listener = LLMCallListener()
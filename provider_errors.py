@@ -0,0 +1,270 @@
+# Typed Provider Error Classification
+# Maps litellm/crewai/google-genai exceptions to error kinds and extracts server-provided retry hints
+
+import re
+import time
+from enum import Enum
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional, Iterator, Any
+import litellm
+
+try:
+    from google.genai.errors import APIError as GenAIError
+except ImportError:  # Only needed to read status and details from native Gemini errors
+    GenAIError = None
+
+
+class ErrorKind(Enum):
+    RATE_LIMITED = "rate_limited"      # 429 - wait for the quota window, then retry
+    SERVER_ERROR = "server_error"      # 500/502/503 - transient provider failure
+    TIMEOUT = "timeout"                # 408/504 or client-side timeout
+    CONNECTION = "connection"          # network failure before a response
+    AUTH = "auth"                      # 401/403 - wrong key or no access
+    PAYMENT = "payment"                # 402 or exhausted credits/quota
+    CONTEXT_LENGTH = "context_length"  # prompt too large for the model
+    BAD_REQUEST = "bad_request"        # 400/404/422 - retrying won't help
+    UNKNOWN = "unknown"
+
+
+# Kinds worth retrying on the same provider; everything else switches provider immediately
+RETRYABLE_KINDS = {ErrorKind.RATE_LIMITED, ErrorKind.SERVER_ERROR, ErrorKind.TIMEOUT, ErrorKind.CONNECTION}
+
+# litellm exception class name -> kind (looked up by name so older litellm versions still import)
+EXCEPTION_KINDS = [
+    ("ContextWindowExceededError", ErrorKind.CONTEXT_LENGTH),
+    ("BudgetExceededError", ErrorKind.PAYMENT),
+    ("RateLimitError", ErrorKind.RATE_LIMITED),
+    ("AuthenticationError", ErrorKind.AUTH),
+    ("PermissionDeniedError", ErrorKind.AUTH),
+    ("Timeout", ErrorKind.TIMEOUT),
+    ("ServiceUnavailableError", ErrorKind.SERVER_ERROR),
+    ("InternalServerError", ErrorKind.SERVER_ERROR),
+    ("BadGatewayError", ErrorKind.SERVER_ERROR),
+    ("APIConnectionError", ErrorKind.CONNECTION),
+    ("NotFoundError", ErrorKind.BAD_REQUEST),
+    ("UnprocessableEntityError", ErrorKind.BAD_REQUEST),
+    ("BadRequestError", ErrorKind.BAD_REQUEST),
+]
+
+# Message fragments for errors that arrive without a status code (e.g. re-raised as plain Exception)
+MESSAGE_KINDS = [
+    (("credits", "afford", "upgrade to a paid account", "insufficient_quota", "payment required"), ErrorKind.PAYMENT),
+    (("invalid api key", "unauthorized", "forbidden"), ErrorKind.AUTH),
+    (("context length", "context window", "maximum context", "too many tokens"), ErrorKind.CONTEXT_LENGTH),
+    (("rate limit", "too many requests", "resource_exhausted", "quota exceeded"), ErrorKind.RATE_LIMITED),
+    (("timeout", "timed out"), ErrorKind.TIMEOUT),
+    (("overloaded", "temporarily unavailable", "internal server error", "service unavailable", "bad gateway"), ErrorKind.SERVER_ERROR),
+]
+
+# A status code quoted in a message is only trusted next to "status", "code" or "HTTP",
+# e.g. "Error code: 429", '"code": 503' or "HTTP 502" - never bare numbers like "5000 tokens"
+MESSAGE_STATUS_PATTERN = re.compile(r"(?:status|code|http)\W{0,4}([45]\d\d)\b", re.IGNORECASE)
+
+# Retry hints embedded in error bodies, e.g. Gemini RetryInfo or OpenAI "try again in 1.5s";
+# google-genai errors quote their body as a Python dict ('retryDelay': '37s'), others as JSON
+MESSAGE_RETRY_PATTERNS = [
+    re.compile(r'''["']?retryDelay["']?\s*:\s*["'](\d+(?:\.\d+)?)s["']''', re.IGNORECASE),
+    re.compile(r"try again in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+    re.compile(r"retry after (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+]
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+@dataclass
+class ProviderError:
+    kind: ErrorKind
+    status_code: Optional[int]
+    retry_after: Optional[float]  # seconds the server asked us to wait, if it said
+    message: str
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind in RETRYABLE_KINDS
+
+
+def _error_chain(error: BaseException) -> Iterator[BaseException]:
+    """The error followed by its causes - crewai often wraps the original litellm error"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    candidates = [getattr(error, "status_code", None), getattr(getattr(error, "response", None), "status_code", None)]
+    if GenAIError is not None and isinstance(error, GenAIError):
+        candidates.insert(0, error.code)  # google-genai keeps the HTTP status in .code
+    for candidate in candidates:
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def _retry_after_from_details(error: BaseException) -> Optional[float]:
+    """Seconds from the google.rpc.RetryInfo detail of a google-genai error body"""
+    if GenAIError is None or not isinstance(error, GenAIError) or not isinstance(error.details, dict):
+        return None
+    body = error.details.get("error", error.details)
+    details = body.get("details") if isinstance(body, dict) else None
+    for detail in details if isinstance(details, list) else []:
+        if isinstance(detail, dict) and str(detail.get("@type", "")).endswith("RetryInfo"):
+            seconds = _parse_duration(str(detail.get("retryDelay", "")))
+            if seconds is not None:
+                return max(0.0, seconds)
+    return None
+
+
+def _headers(error: BaseException) -> dict:
+    """Response headers from a litellm/httpx error, lower-cased"""
+    for source in (getattr(error, "litellm_response_headers", None),
+                   getattr(getattr(error, "response", None), "headers", None),
+                   getattr(error, "headers", None)):
+        if source:
+            try:
+                return {str(key).lower(): str(value) for key, value in dict(source).items()}
+            except (TypeError, ValueError):
+                continue
+    return {}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Seconds from "20", "1.5s", "6m0s" or "250ms" (OpenAI-style reset headers)"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def retry_after_from_headers(headers: dict, now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait according to Retry-After and rate-limit reset headers"""
+    now = time.time() if now is None else now
+
+    if "retry-after-ms" in headers:
+        try:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        except ValueError:
+            pass
+
+    if "retry-after" in headers:
+        value = headers["retry-after"]
+        seconds = _parse_duration(value)
+        if seconds is not None:
+            return max(0.0, seconds)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - now)  # HTTP-date form
+        except (TypeError, ValueError):
+            pass
+
+    resets = []
+    for key in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        if key in headers:
+            seconds = _parse_duration(headers[key])
+            if seconds is not None:
+                resets.append(seconds)
+    if "x-ratelimit-reset" in headers:
+        # OpenRouter sends an epoch timestamp in milliseconds, others send seconds-from-now
+        try:
+            value = float(headers["x-ratelimit-reset"])
+            if value > 1e12:
+                resets.append(value / 1000 - now)
+            elif value > 1e9:
+                resets.append(value - now)
+            else:
+                resets.append(value)
+        except ValueError:
+            pass
+    return max(0.0, max(resets)) if resets else None
+
+
+def _retry_after_from_message(message: str) -> Optional[float]:
+    for pattern in MESSAGE_RETRY_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def _kind_from_exception(error: BaseException) -> Optional[ErrorKind]:
+    for class_name, kind in EXCEPTION_KINDS:
+        exception_class: Any = getattr(litellm, class_name, None)
+        if isinstance(exception_class, type) and isinstance(error, exception_class):
+            return kind
+    if isinstance(error, TimeoutError):
+        return ErrorKind.TIMEOUT
+    if isinstance(error, ConnectionError):
+        return ErrorKind.CONNECTION
+    return None
+
+
+def _kind_from_status(status_code: int) -> ErrorKind:
+    if status_code == 429:
+        return ErrorKind.RATE_LIMITED
+    if status_code == 402:
+        return ErrorKind.PAYMENT
+    if status_code in (401, 403):
+        return ErrorKind.AUTH
+    if status_code == 413:
+        return ErrorKind.CONTEXT_LENGTH
+    if status_code in (408, 504):
+        return ErrorKind.TIMEOUT
+    if status_code >= 500:
+        return ErrorKind.SERVER_ERROR
+    return ErrorKind.BAD_REQUEST
+
+
+def _kind_from_message(message: str) -> ErrorKind:
+    lowered = message.lower()
+    for fragments, kind in MESSAGE_KINDS:
+        if any(fragment in lowered for fragment in fragments):
+            return kind
+    match = MESSAGE_STATUS_PATTERN.search(message)
+    if match:
+        return _kind_from_status(int(match.group(1)))
+    return ErrorKind.UNKNOWN
+
+
+def classify_error(error: BaseException) -> ProviderError:
+    """
+    Classify a provider error by exception type, then status code, then message
+
+    The retry hint comes from Retry-After / rate-limit reset headers when the
+    provider sent them, then from Gemini's RetryInfo detail, otherwise from a
+    retry delay quoted in the error message.
+    """
+    kind = None
+    status_code = None
+    retry_after = None
+    messages = []
+
+    for link in _error_chain(error):
+        messages.append(str(link))
+        kind = kind or _kind_from_exception(link)
+        status_code = status_code or _status_code(link)
+        if retry_after is None:
+            retry_after = retry_after_from_headers(_headers(link))
+        if retry_after is None:
+            retry_after = _retry_after_from_details(link)
+
+    message = " | ".join(messages)
+    if kind is None and status_code is not None:
+        kind = _kind_from_status(status_code)
+    if kind is None:
+        kind = _kind_from_message(message)
+
+    # Quota exhaustion is reported as a 429 by some providers but will not recover by waiting
+    if kind == ErrorKind.RATE_LIMITED and _kind_from_message(message) == ErrorKind.PAYMENT:
+        kind = ErrorKind.PAYMENT
+
+    if retry_after is None:
+        retry_after = _retry_after_from_message(message)
+
+    return ProviderError(kind=kind, status_code=status_code, retry_after=retry_after, message=str(error))
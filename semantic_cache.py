@@ -0,0 +1,244 @@
+# Semantic Task-Output Cache
+# Reuses upstream task results for near-duplicate user profiles using local CPU embeddings
+
+import os
+import re
+import time
+import zlib
+import threading
+import logging
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from knowledge_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Career stage phrasings collapsed into one feature - the stage changes the advice,
+# while the exact wording ("11th grader" vs "high school junior") does not
+STAGE_PATTERNS = {
+    "high_school": re.compile(r"high[ -]?school|\b(9|10|11|12)th\b|\bgrader\b|\bteen"),
+    "college": re.compile(r"college|universit|undergrad|bachelor|\bmajor(ing)?\b"),
+    "graduate": re.compile(r"master'?s|\bphd\b|grad(uate)? school"),
+    "professional": re.compile(r"professional|working|career change|years of experience|\bemployed\b"),
+}
+
+NAME_LINE = re.compile(r"^\s*name\s*:\s*(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+NAME_PLACEHOLDER = "{{user_name}}"
+
+# "Label: value" lines of the user_info built by static/index.html
+FORM_LINE = re.compile(r"^\s*([a-z][a-z &]*?)\s*:\s*(.*)$", re.IGNORECASE)
+FORM_LABELS = {
+    "current stage", "interests", "passions", "skills & experience", "achievements",
+    "career goals", "work preferences", "resume analysis", "resume file", "file type", "file size", "note",
+}
+# Fields describing the upload rather than the user, and the text the form sends for empty fields
+IGNORED_FIELDS = {"resume analysis", "resume file", "file type", "file size", "note"}
+FORM_DEFAULTS = {"", "not specified - looking for guidance", "open to all options - seeking recommendations"}
+# Fields that must match exactly before two profiles may share cached outputs
+HARD_MATCH_FIELDS = ("current stage", "interests")
+
+
+def split_name(user_info: str) -> Tuple[Optional[str], str]:
+    """
+    Pull the "Name: ..." line out of the user info
+    Returns (name, remaining text) so two users with the same profile share a cache key.
+    """
+    match = NAME_LINE.search(user_info)
+    if not match:
+        return None, user_info
+    return match.group(1), NAME_LINE.sub("", user_info, count=1)
+
+
+def parse_form(user_info: str) -> Optional[Dict[str, str]]:
+    """Form fields by lower-cased label, or None for free-form text (e.g. from the CLI)"""
+    fields: Dict[str, str] = {}
+    label = None
+    for line in user_info.splitlines():
+        match = FORM_LINE.match(line)
+        if match and match.group(1).strip().lower() in FORM_LABELS:
+            label = match.group(1).strip().lower()
+            fields[label] = match.group(2).strip()
+        elif label is not None and line.strip():
+            fields[label] = f"{fields[label]} {line.strip()}".strip()
+    return fields or None
+
+
+def profile_content(user_info: str) -> str:
+    """
+    The user's own answers, without form labels, upload details or default filler.
+    Otherwise two sparse forms share most of their text and always look alike.
+    """
+    fields = parse_form(user_info)
+    if fields is None:
+        return user_info
+    return "\n".join(
+        value for label, value in fields.items()
+        if label not in IGNORED_FIELDS and value.lower() not in FORM_DEFAULTS
+    )
+
+
+def hard_match_key(user_info: str) -> str:
+    """Stage and interest choices, normalized - profiles only match within the same key"""
+    fields = parse_form(user_info) or {}
+    parts = []
+    for label in HARD_MATCH_FIELDS:
+        choices = sorted(choice.strip().lower() for choice in fields.get(label, "").split(",") if choice.strip())
+        parts.append(",".join(choices))
+    return "|".join(parts)
+
+
+def anonymize(outputs: Dict[str, str], name: Optional[str]) -> Dict[str, str]:
+    """Replace the user's name with a placeholder before caching"""
+    if not name:
+        return dict(outputs)
+    pattern = re.compile(rf"\b{re.escape(name)}\b", re.IGNORECASE)
+    return {key: pattern.sub(NAME_PLACEHOLDER, value) for key, value in outputs.items()}
+
+
+def personalize(outputs: Dict[str, str], name: Optional[str]) -> Dict[str, str]:
+    """Fill the placeholder with the current user's name"""
+    replacement = name or "the user"
+    return {key: value.replace(NAME_PLACEHOLDER, replacement) for key, value in outputs.items()}
+
+
+class HashingEmbedder:
+    """
+    Dependency-free CPU embedder based on feature hashing.
+    Words, word bigrams and character trigrams are hashed into a fixed-size
+    signed vector, so paraphrases that share vocabulary land close together.
+    Synonym normalization comes from the knowledge index tokenizer ("bio" -> "biology").
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        lowered = text.lower()
+        tokens = [token for token in tokenize(lowered) if token not in ("high", "school")]
+        features = [(f"s:{stage}", 2.0) for stage, pattern in STAGE_PATTERNS.items() if pattern.search(lowered)]
+        features += [(f"w:{token}", 1.0) for token in tokens]
+        features += [(f"b:{a}_{b}", 0.5) for a, b in zip(tokens, tokens[1:])]
+        for token in tokens:
+            padded = f"#{token}#"
+            features += [(f"c:{padded[i:i + 3]}", 0.15) for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vector[h % self.dim] += sign * weight
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+class SemanticCache:
+    """
+    Fixed-capacity nearest-neighbour cache keyed by text similarity
+
+    Embeddings live in one preallocated matrix so a lookup is a single
+    matrix-vector product. Only entries with the same hard-match key (stage
+    and interests) are candidates, and only the user's answers are embedded.
+    Entries expire after `ttl` seconds and the least recently used entry is
+    evicted when the cache is full.
+    """
+
+    def __init__(self, threshold: float = 0.82, max_entries: int = 512,
+                 ttl: float = 24 * 3600, embedder: Optional[HashingEmbedder] = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedder = embedder or HashingEmbedder()
+
+        self._vectors = np.zeros((max_entries, self.embedder.dim), dtype=np.float32)
+        self._values: List[Optional[Dict[str, str]]] = [None] * max_entries
+        self._keys: List[Optional[str]] = [None] * max_entries
+        self._created = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _live_mask(self, now: float) -> np.ndarray:
+        occupied = np.array([value is not None for value in self._values])
+        return occupied & (now - self._created <= self.ttl)
+
+    def _similarities(self, vector: np.ndarray, key: str, live: np.ndarray) -> np.ndarray:
+        similarities = self._vectors @ vector
+        same_key = np.array([entry_key == key for entry_key in self._keys])
+        similarities[~(live & same_key)] = -1.0
+        return similarities
+
+    def get(self, text: str) -> Optional[Dict[str, str]]:
+        """Cached outputs of the most similar stored request, or None"""
+        query = self.embedder.embed(profile_content(text))
+        key = hard_match_key(text)
+        now = time.time()
+
+        with self._lock:
+            live = self._live_mask(now)
+            if not live.any():
+                self.misses += 1
+                return None
+
+            similarities = self._similarities(query, key, live)
+            best = int(np.argmax(similarities))
+
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._last_used[best] = now
+            self.hits += 1
+            logger.info(f"Semantic cache hit (similarity {similarities[best]:.2f})")
+            return dict(self._values[best])
+
+    def put(self, text: str, outputs: Dict[str, str]):
+        """Store task outputs, merging into a near-identical entry if one exists"""
+        if not outputs:
+            return
+        vector = self.embedder.embed(profile_content(text))
+        key = hard_match_key(text)
+        now = time.time()
+
+        with self._lock:
+            live = self._live_mask(now)
+            similarities = self._similarities(vector, key, live)
+            best = int(np.argmax(similarities))
+
+            if similarities[best] >= self.threshold:
+                slot = best
+                outputs = {**self._values[slot], **outputs}
+            elif not live.all():
+                slot = int(np.argmin(live))  # first free or expired slot
+            else:
+                slot = int(np.argmin(self._last_used))  # evict least recently used
+
+            self._vectors[slot] = vector
+            self._values[slot] = dict(outputs)
+            self._keys[slot] = key
+            self._created[slot] = now
+            self._last_used[slot] = now
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": int(self._live_mask(time.time()).sum()),
+                "capacity": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "threshold": self.threshold,
+            }
+
+
+# Global instance for profile_analysis / career_exploration outputs
+task_output_cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.82")),
+    max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 3600))),
+)
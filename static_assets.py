@@ -0,0 +1,182 @@
+# Static Asset Pipeline
+# Serves a whitelisted asset directory with precompressed variants, strong ETags and cache headers
+
+import gzip
+import hashlib
+import mimetypes
+import logging
+from pathlib import Path
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Tuple
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional - gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).parent / "static"
+
+# Only these file types are ever served - everything else in the directory is ignored
+ALLOWED_EXTENSIONS = {".html", ".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".webp", ".ico", ".json", ".txt", ".woff2"}
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".svg", ".json", ".txt"}
+
+# HTML entry points live at fixed URLs - always revalidate (a cheap 304 when unchanged)
+REVALIDATE_CACHE = "no-cache"
+# Other assets under /static/
+SHORT_CACHE = "public, max-age=3600"
+
+# Preference order when the client accepts several encodings
+ENCODING_PREFERENCE = ["br", "gzip"]
+
+
+@dataclass
+class StaticAsset:
+    name: str
+    content_type: str
+    version: str  # content hash, used for ETags
+    last_modified: str
+    mtime: float
+    variants: Dict[str, bytes] = field(default_factory=dict)  # encoding -> body ("identity" always present)
+
+    def etag(self, encoding: str) -> str:
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.version}{suffix}"'
+
+
+def _compress_variants(content: bytes) -> Dict[str, bytes]:
+    """Precompressed bodies, kept only when they are actually smaller"""
+    variants = {"identity": content}
+    candidates = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        candidates["br"] = brotli.compress(content, quality=11)
+    for encoding, body in candidates.items():
+        if len(body) < len(content):
+            variants[encoding] = body
+    return variants
+
+
+def _accepted_encodings(header: str) -> List[str]:
+    """Encodings from Accept-Encoding with q > 0"""
+    accepted = []
+    for part in header.split(","):
+        pieces = [piece.strip() for piece in part.split(";")]
+        if not pieces[0]:
+            continue
+        quality = 1.0
+        for param in pieces[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.append(pieces[0].lower())
+    return accepted
+
+
+class StaticAssetStore:
+    """
+    In-memory store of every whitelisted asset, built once at startup
+
+    Each asset is read, hashed and compressed up front, so serving a request
+    is a dictionary lookup plus header checks - no disk access or compression
+    on the request path.
+    """
+
+    def __init__(self, directory: Path = STATIC_DIR):
+        self.directory = directory
+        self.assets: Dict[str, StaticAsset] = {}
+        self.load()
+
+    def load(self):
+        assets = {}
+        for path in sorted(self.directory.rglob("*")):
+            relative = path.relative_to(self.directory)
+            if not path.is_file() or path.suffix.lower() not in ALLOWED_EXTENSIONS:
+                continue
+            if any(part.startswith(".") for part in relative.parts):
+                continue
+
+            content = path.read_bytes()
+            mtime = path.stat().st_mtime
+            content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+                content_type += "; charset=utf-8"
+
+            name = relative.as_posix()
+            assets[name] = StaticAsset(
+                name=name,
+                content_type=content_type,
+                version=hashlib.sha256(content).hexdigest()[:16],
+                last_modified=formatdate(mtime, usegmt=True),
+                mtime=mtime,
+                variants=_compress_variants(content) if path.suffix.lower() in COMPRESSIBLE_EXTENSIONS else {"identity": content},
+            )
+
+        self.assets = assets
+        logger.info(f"Loaded {len(assets)} static assets from {self.directory}")
+
+    def _not_modified(self, request: Request, asset: StaticAsset) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            known = {asset.etag(encoding) for encoding in asset.variants}
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            tags = {tag[2:] if tag.startswith("W/") else tag for tag in tags}
+            return bool(tags & known)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(asset.mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _choose_encoding(self, request: Request, asset: StaticAsset) -> str:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding in ENCODING_PREFERENCE:
+            if encoding in asset.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def response(self, request: Request, name: str, cache_control: str = SHORT_CACHE) -> Response:
+        """Serve an asset with compression, validators and cache headers (404 if not whitelisted)"""
+        asset = self.assets.get(name)
+        if asset is None:
+            return Response(status_code=404)
+
+        encoding = self._choose_encoding(request, asset)
+        headers = {
+            "ETag": asset.etag(encoding),
+            "Last-Modified": asset.last_modified,
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if self._not_modified(request, asset):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        body = asset.variants[encoding]
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(content=body, media_type=asset.content_type, headers=headers)
+
+    def stats(self) -> List[Tuple[str, Dict[str, int]]]:
+        """Size of every variant per asset, for the status endpoint"""
+        return [
+            (name, {encoding: len(body) for encoding, body in asset.variants.items()})
+            for name, asset in self.assets.items()
+        ]
+
+# Global instance - built at startup
+static_assets = StaticAssetStore()
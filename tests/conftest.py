@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Tests run offline - use LiteLLM's bundled model cost map instead of fetching it
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+# Provider clients are built at import time and only need a key to exist
+for key in ("GOOGLE_API_KEY", "OPENROUTER_API_KEY", "OPENROUTER_API_KEY_1", "PERPLEXITY_API_KEY", "SERPER_API_KEY"):
+    os.environ.setdefault(key, "test-key")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
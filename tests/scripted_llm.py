@@ -0,0 +1,50 @@
+# Scripted LLM and Tool
+# Stand-ins that let tests run real CrewAI crews offline
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM, llm_call_context
+from crewai.tools import BaseTool
+
+SEARCH_STEP = 'Thought: I should search\nAction: search\nAction Input: {"query": "nurse salary"}'
+FINAL_ANSWER = "Thought: I know the answer\nFinal Answer: hello"
+
+
+class ScriptedLLM(BaseLLM):
+    """Replays canned ReAct steps, reports `usage` per call and cancels `token` after `cancel_after` calls"""
+
+    script: list = []
+    calls: int = 0
+    cancel_after: int = 0
+    token: object = None
+    usage: dict = {}
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None, **kwargs):
+        self.calls += 1
+        with llm_call_context():  # Same call_id on both events, as the native providers do
+            self._emit_call_started_event(messages=messages, from_task=from_task, from_agent=from_agent)
+            output = self.script[min(self.calls, len(self.script)) - 1]
+            self._emit_call_completed_event(response=output, call_type=LLMCallType.LLM_CALL, from_task=from_task,
+                                            from_agent=from_agent, messages=messages, usage=self.usage or None)
+        if self.token is not None and self.cancel_after and self.calls >= self.cancel_after:
+            self.token.cancel("client disconnected")
+        return output
+
+    def supports_function_calling(self):
+        return False
+
+    def supports_stop_words(self):
+        return False
+
+    def get_context_window_size(self):
+        return 8000
+
+
+class CountingSearch(BaseTool):
+    name: str = "search"
+    description: str = "Search the web"
+    runs: int = 0
+
+    def _run(self, query: str = "") -> str:
+        self.runs += 1
+        return "Nurses earn well"
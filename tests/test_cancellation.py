@@ -0,0 +1,40 @@
+import pytest
+from crewai import Agent, Crew, Process, Task
+
+from cancellation import CancellationToken, CrewCancelledError, cancellation_scope
+from main import CancellableSerperDevTool
+from scripted_llm import FINAL_ANSWER, SEARCH_STEP, CountingSearch, ScriptedLLM
+
+
+def run_crew(llm, tools):
+    agent = Agent(role="Researcher", goal="Answer", backstory="Researches", llm=llm, tools=tools)
+    task = Task(description="Find nurse salaries", expected_output="A number", agent=agent)
+    crew = Crew(agents=[agent], tasks=[task], process=Process.sequential)
+    with cancellation_scope(llm.token):
+        return crew.kickoff()
+
+
+def test_cancelled_crew_stops_mid_task():
+    search = CountingSearch()
+    llm = ScriptedLLM(model="scripted", script=[SEARCH_STEP, SEARCH_STEP, FINAL_ANSWER],
+                      cancel_after=1, token=CancellationToken())
+
+    with pytest.raises(CrewCancelledError):
+        run_crew(llm, [search])
+    assert llm.calls == 1
+    assert search.runs <= 1
+
+
+def test_uncancelled_crew_finishes():
+    llm = ScriptedLLM(model="scripted", script=[SEARCH_STEP, FINAL_ANSWER], token=CancellationToken())
+    assert run_crew(llm, [CountingSearch()]).raw == "hello"
+    assert llm.calls == 2
+
+
+def test_search_is_skipped_once_cancelled(monkeypatch):
+    tool = CancellableSerperDevTool()
+    monkeypatch.setattr("crewai_tools.SerperDevTool._run", lambda self, **kwargs: pytest.fail("searched after cancel"))
+    token = CancellationToken()
+    token.cancel()
+    with cancellation_scope(token):
+        assert "cancelled" in tool._run(search_query="nurse salary")
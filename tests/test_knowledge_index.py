@@ -0,0 +1,46 @@
+import pytest
+
+from knowledge_index import CareerKnowledgeIndex, build_index
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    path = build_index(index_path=str(tmp_path_factory.mktemp("index") / "career_knowledge.idx"))
+    index = CareerKnowledgeIndex(path)
+    yield index
+    index.close()
+
+
+def top_title(index, query):
+    hits = index.search(query)
+    assert hits, f"no results for {query!r}"
+    return index.records[hits[0][1]][2]
+
+
+@pytest.mark.parametrize("query, title", [
+    ("cybersecurity", "Cybersecurity Analyst"),
+    ("cyber", "Cybersecurity Analyst"),
+    ("nurse", "Registered Nurse"),
+    ("nursing", "Registered Nurse"),
+    ("accountant", "Accountant"),
+    ("teacher", "Teacher"),
+    ("physician", "Physician"),
+    ("animator", "Animator / 3D Artist"),
+    ("software", "Software Developer"),
+    ("cloud", "Cloud Engineer"),
+    ("finance", "Financial Analyst"),
+    ("psychology", "Counselor / Psychologist"),
+    ("robotics", "Mechanical Engineer"),
+    ("data analyst salary", "Data Analyst"),
+])
+def test_career_queries_rank_the_career_first(index, query, title):
+    assert top_title(index, query) == title
+
+
+@pytest.mark.parametrize("query", ["python", "sql", "statistics"])
+def test_skill_queries_rank_the_skill_first(index, query):
+    assert top_title(index, query) == query
+
+
+def test_career_lookup_includes_salary_bands(index):
+    assert "Salary bands" in index.lookup("cybersecurity")
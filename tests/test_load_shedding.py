@@ -0,0 +1,52 @@
+import uuid
+
+import pytest
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMCallFailedEvent, LLMCallStartedEvent
+
+import app
+from degraded_mode import degraded_engine
+from llm_handler import ProviderTelemetry, llm_handler
+from main import career_advisor_crew
+
+USER_INFO = "Name: Sam\nCurrent Stage: high-school\nInterests: Technology\nPassions: coding games"
+
+
+@pytest.fixture
+def telemetry(monkeypatch):
+    monkeypatch.setattr(llm_handler, "telemetry", ProviderTelemetry())
+    monkeypatch.setattr(app, "LOAD_SHEDDING", "auto")
+    monkeypatch.setattr(app, "queued_jobs", 0)
+    return llm_handler.telemetry
+
+
+def fail_calls(model, count):
+    for _ in range(count):
+        call_id = uuid.uuid4().hex
+        crewai_event_bus.emit(None, LLMCallStartedEvent(model=model, call_id=call_id))
+        crewai_event_bus.emit(None, LLMCallFailedEvent(model=model, call_id=call_id, error="503 - overloaded"))
+    crewai_event_bus.flush()
+
+
+def test_sheds_load_once_every_provider_is_failing(telemetry):
+    models = {llm.model for chain in llm_handler.llm_providers.values() for llm in chain}
+    assert app.load_shed_reason() is None
+
+    for model in models:
+        fail_calls(model, 5)
+    assert app.load_shed_reason() == "all LLM providers unhealthy"
+
+
+def test_one_healthy_provider_keeps_the_crew_running(telemetry):
+    models = sorted({llm.model for chain in llm_handler.llm_providers.values() for llm in chain})
+    for model in models[1:]:
+        fail_calls(model, 5)
+    assert app.load_shed_reason() is None
+
+
+def test_fallback_report_does_not_repeat_itself():
+    results = [degraded_engine.section(agent_type, USER_INFO) for agent_type in career_advisor_crew.task_agent_mapping.values()]
+    report = career_advisor_crew._combine_results(results)
+    assert report.count("Top Career Recommendations") == 0
+    assert report.count("# Career Path Recommendations") == 1
+    assert "# Summary" in report
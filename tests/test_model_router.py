@@ -0,0 +1,69 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from crewai.events import crewai_event_bus
+from google.genai import errors
+
+from llm_handler import ProviderTelemetry, llm_handler
+from model_router import DEFAULT_POLICY, ModelRouter
+
+FAST, BALANCED, STRONG = "gemini-2.0-flash", "sonar-reasoning-pro", "deepseek/deepseek-r1"
+
+
+@pytest.fixture
+def router():
+    llms = {model: SimpleNamespace(model=model) for model in (FAST, BALANCED, STRONG)}
+    handler = SimpleNamespace(
+        llm_providers={"roadmap_strategy": [llms[FAST], llms[STRONG], llms[BALANCED]]},
+        telemetry=ProviderTelemetry(alpha=1.0),
+        _get_llm_name=lambda llm: llm.model,
+    )
+    return ModelRouter(handler=handler, policy=json.loads(json.dumps(DEFAULT_POLICY)))
+
+
+@pytest.mark.parametrize("agent_type, tier", [
+    ("profile_analysis", "fast"),
+    ("career_exploration", "balanced"),
+    ("roadmap_strategy", "strong"),
+])
+def test_task_tier(router, agent_type, tier):
+    assert router.select_tier(agent_type) == tier
+
+
+def test_large_input_bumps_one_tier(router):
+    assert router.select_tier("career_exploration", input_size=5000) == "strong"
+    assert router.select_tier("roadmap_strategy", input_size=5000) == "strong"
+
+
+def test_slow_tier_steps_down(router):
+    router.handler.telemetry.record(STRONG, 120.0, success=True)
+    assert router.select_tier("roadmap_strategy") == "balanced"
+
+
+@pytest.mark.parametrize("endpoint, fast_mode", [("default", True), ("preview", None)])
+def test_fast_mode_clamps_to_fast(router, endpoint, fast_mode):
+    assert router.select_tier("roadmap_strategy", input_size=5000, endpoint=endpoint, fast_mode=fast_mode) == "fast"
+
+
+def test_unhealthy_model_is_demoted(router):
+    assert router.route("roadmap_strategy")[0].model == STRONG
+    router.handler.telemetry.record(STRONG, 1.0, success=False)
+    assert router.route("roadmap_strategy")[-1].model == STRONG
+
+
+def test_native_provider_failures_reach_telemetry(monkeypatch):
+    import prompt_cache  # noqa: F401 - registers the LLM call listener
+
+    llm = llm_handler.llm_providers["profile_analysis"][0]
+    error = errors.ServerError(503, {"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}})
+
+    def unavailable(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(llm._get_sync_client().models, "generate_content", unavailable)
+    before = llm_handler.telemetry.snapshot().get(llm.model, {}).get("failures", 0)
+    with pytest.raises(errors.ServerError):
+        llm.call("hello")
+    crewai_event_bus.flush()
+    assert llm_handler.telemetry.snapshot()[llm.model]["failures"] == before + 1
@@ -0,0 +1,57 @@
+import pytest
+
+from llm_handler import llm_handler
+from output_budgets import TaskMetrics, effective_output_budget, with_output_budget
+
+
+@pytest.mark.parametrize("model", ["openrouter/deepseek/deepseek-r1", "sonar-reasoning-pro", "deepseek/deepseek-r1"])
+def test_reasoning_models_are_not_capped(model):
+    assert effective_output_budget(model, 1000) is None
+
+
+def test_other_models_keep_their_budget():
+    assert effective_output_budget("openrouter/meta-llama/llama-3.3-70b-instruct", 1000) == 1000
+
+
+def test_summary_reports_context_tokens():
+    metrics = TaskMetrics()
+    metrics.record("skill_development", "{}", 900, "structured", context_tokens=600)
+    metrics.record("skill_development", "{}", 900, "structured", context_tokens=400)
+    summary = metrics.summary()["skill_development"]["structured"]
+    assert summary["avg_context_tokens"] == 500
+    assert summary["json_valid"] == 2
+
+
+class Sent(Exception):
+    """Stops a captured request before it reaches the network"""
+
+
+def capture(monkeypatch, resource, method):
+    sent = {}
+
+    def fake(*args, **kwargs):
+        sent.update(kwargs)
+        raise Sent()
+
+    monkeypatch.setattr(resource, method, fake)
+    return sent
+
+
+def test_gemini_request_carries_the_cap(monkeypatch):
+    capped = with_output_budget(llm_handler.llm_providers["profile_analysis"][0], 500)
+    sent = capture(monkeypatch, capped._get_sync_client().models, "generate_content")
+    with pytest.raises(Exception):
+        capped.call("hello")
+    assert sent["model"] == "gemini-2.0-flash"
+    assert sent["config"].max_output_tokens == 500
+
+
+def test_openrouter_request_keeps_model_and_endpoint(monkeypatch):
+    original = next(llm for llm in llm_handler.llm_providers["skill_development"] if "deepseek" in llm.model)
+    capped = with_output_budget(original, 900)
+    sent = capture(monkeypatch, capped._get_sync_client().chat.completions, "create")
+    with pytest.raises(Exception):
+        capped.call("hello")
+    assert sent["model"] == "deepseek/deepseek-r1"
+    assert sent["max_tokens"] == 900
+    assert str(capped._get_sync_client().base_url).startswith("https://openrouter.ai/api/v1")
@@ -0,0 +1,23 @@
+from crewai.events import crewai_event_bus
+from google.genai import types
+
+import prompt_cache  # noqa: F401 - registers the LLM call listener
+from llm_handler import ProviderTelemetry, llm_handler
+
+
+def test_native_gemini_usage_reaches_telemetry(monkeypatch):
+    monkeypatch.setattr(llm_handler, "telemetry", ProviderTelemetry())
+    llm = llm_handler.llm_providers["profile_analysis"][0]
+    response = types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part(text="hello")]))],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=5000, candidates_token_count=10, cached_content_token_count=4096, total_token_count=5010,
+        ),
+    )
+    monkeypatch.setattr(llm._get_sync_client().models, "generate_content", lambda *args, **kwargs: response)
+
+    assert llm.call("hello") == "hello"
+    crewai_event_bus.flush()
+    usage = llm_handler.telemetry.usage_snapshot()[llm.model]
+    assert (usage["prompt_tokens"], usage["completion_tokens"], usage["cached_tokens"]) == (5000, 10, 4096)
+    assert llm_handler.telemetry.snapshot()[llm.model]["calls"] == 1
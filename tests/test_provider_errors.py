@@ -0,0 +1,49 @@
+import pytest
+
+from provider_errors import ErrorKind, classify_error
+
+
+@pytest.mark.parametrize("message, kind", [
+    ("Error code: 429 - slow down", ErrorKind.RATE_LIMITED),
+    ('{"error": {"code": 503, "message": "overloaded"}}', ErrorKind.SERVER_ERROR),
+    ("HTTP 502 from upstream", ErrorKind.SERVER_ERROR),
+    ("status_code=401", ErrorKind.AUTH),
+    ("Please upgrade to a paid account (status 429)", ErrorKind.PAYMENT),
+    ("Request timed out", ErrorKind.TIMEOUT),
+])
+def test_message_classification(message, kind):
+    assert classify_error(Exception(message)).kind == kind
+
+
+@pytest.mark.parametrize("message", [
+    "prompt has 5000 tokens",
+    "Invalid response: 4020 characters",
+    "used 500 tokens",
+])
+def test_bare_numbers_are_not_status_codes(message):
+    error = classify_error(Exception(message))
+    assert error.kind == ErrorKind.UNKNOWN
+    assert not error.retryable
+
+
+RETRY_INFO_BODY = {"error": {
+    "code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED",
+    "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "37s"}],
+}}
+
+
+def test_gemini_client_error():
+    from google.genai import errors
+
+    error = classify_error(errors.ClientError(429, RETRY_INFO_BODY))
+    assert error.kind == ErrorKind.RATE_LIMITED
+    assert error.status_code == 429
+    assert error.retry_after == 37
+
+
+@pytest.mark.parametrize("message", [
+    """429 RESOURCE_EXHAUSTED. {'error': {'details': [{'retryDelay': '37s'}]}}""",
+    '{"error": {"details": [{"retryDelay": "37s"}]}}',
+])
+def test_retry_delay_in_message(message):
+    assert classify_error(Exception(message)).retry_after == 37
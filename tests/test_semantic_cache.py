@@ -0,0 +1,44 @@
+import pytest
+
+from semantic_cache import SemanticCache, profile_content
+
+
+def form(interest, passions="", skills="", stage="high-school"):
+    return (
+        "Name: Alex\n"
+        f"Current Stage: {stage}\n"
+        f"Interests: {interest}\n"
+        f"Passions: {passions}\n"
+        f"Skills & Experience: {skills}\n"
+        "Achievements: \n"
+        "Career Goals: Not specified - looking for guidance\n"
+        "Work Preferences: Open to all options - seeking recommendations"
+    )
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(threshold=0.82, max_entries=8)
+
+
+def test_near_paraphrase_hits(cache):
+    cache.put(form("Technology", "I love building apps and coding games", "Python, basic web development"),
+              {"profile_analysis": "cached"})
+    hit = cache.get(form("Technology", "I enjoy coding and building apps and games", "Basic web development, Python"))
+    assert hit == {"profile_analysis": "cached"}
+
+
+@pytest.mark.parametrize("other", ["Technology", "Law, Public Safety & Government", "Medical"])
+def test_different_interest_misses(cache, other):
+    cache.put(form("Healthcare"), {"profile_analysis": "cached"})
+    assert cache.get(form(other)) is None
+
+
+def test_different_stage_misses(cache):
+    cache.put(form("Technology", "coding"), {"profile_analysis": "cached"})
+    assert cache.get(form("Technology", "coding", stage="working-professional")) is None
+
+
+def test_form_labels_and_defaults_are_not_embedded():
+    content = profile_content(form("Healthcare") + "\nResume File: cv.pdf\nNote: This user is a student.\nPlease analyze their resume")
+    assert content.split("\n") == ["high-school", "Healthcare"]
@@ -0,0 +1,76 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from static_assets import REVALIDATE_CACHE, SHORT_CACHE, StaticAssetStore
+
+PAGE = b"<html><body>" + b"<p>Career guidance</p>" * 200 + b"</body></html>"
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "index.html").write_bytes(PAGE)
+    (tmp_path / ".env").write_text("SECRET=1")
+    store = StaticAssetStore(tmp_path)
+    app = FastAPI()
+
+    @app.api_route("/app", methods=["GET", "HEAD"])
+    async def read_app(request: Request):
+        return store.response(request, "index.html", cache_control=REVALIDATE_CACHE)
+
+    @app.api_route("/static/{name:path}", methods=["GET", "HEAD"])
+    async def read_static(request: Request, name: str):
+        return store.response(request, name)
+
+    return TestClient(app)
+
+
+def test_serves_compressed_variant_with_validators(client):
+    response = client.get("/app", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == REVALIDATE_CACHE
+    assert response.headers["etag"].endswith('-gzip"')
+    assert response.content == PAGE  # decoded by the client
+
+    assert client.get("/static/index.html").headers["cache-control"] == SHORT_CACHE
+    assert client.get("/static/.env").status_code == 404
+
+
+def test_if_none_match_returns_304(client):
+    etag = client.get("/app", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get("/app", headers={"Accept-Encoding": "gzip", "If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert client.get("/app", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_if_modified_since_returns_304(client):
+    last_modified = client.get("/app").headers["last-modified"]
+    assert client.get("/app", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/app", headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}).status_code == 200
+    # If-None-Match takes precedence over If-Modified-Since
+    headers = {"If-None-Match": '"stale"', "If-Modified-Since": last_modified}
+    assert client.get("/app", headers=headers).status_code == 200
+
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    ("gzip;q=0", None),
+    ("gzip;q=0, identity", None),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("*", "gzip"),
+    ("", None),
+])
+def test_accept_encoding_q_values(client, accept_encoding, encoding):
+    response = client.get("/app", headers={"Accept-Encoding": accept_encoding})
+    assert response.headers.get("content-encoding") == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_head_sends_headers_without_body(client):
+    get = client.get("/app", headers={"Accept-Encoding": "gzip"})
+    head = client.head("/app", headers={"Accept-Encoding": "gzip"})
+    assert head.status_code == 200
+    assert head.content == b""
+    assert head.headers["etag"] == get.headers["etag"]
+    assert int(head.headers["content-length"]) == int(get.headers["content-length"])
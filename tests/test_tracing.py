@@ -0,0 +1,74 @@
+from crewai import Agent, Crew, Process, Task
+
+import prompt_cache  # noqa: F401 - registers the LLM call listener
+from scripted_llm import FINAL_ANSWER, SEARCH_STEP, CountingSearch, ScriptedLLM
+from tracing import Span, Trace, begin_task, end_task, finish_trace, tracing_scope
+
+
+def synthetic_trace():
+    """request 0-10s: profile task 0-4s, then a career task 4-10s with one LLM call 5-9s"""
+    trace = Trace("request")
+    trace.root = Span("request", "request", 0.0, 10.0)
+    profile = Span("profile_analysis", "task", 0.0, 4.0)
+    career = Span("career_exploration", "task", 4.0, 10.0)
+    career.children.append(Span("gemini-2.0-flash", "llm", 5.0, 9.0, attrs={"prompt_tokens": 900}))
+    trace.root.children += [profile, career]
+    return trace
+
+
+def test_critical_path_follows_sequential_tasks():
+    path = {span.name: round(seconds, 3) for span, seconds in synthetic_trace().critical_path()}
+    assert path == {"profile_analysis": 4.0, "career_exploration": 2.0, "gemini-2.0-flash": 4.0}
+
+
+def test_critical_path_skips_overlapped_work():
+    trace = Trace("request")
+    trace.root = Span("request", "request", 0.0, 10.0)
+    trace.root.children += [Span("search", "tool", 0.0, 8.0), Span("gemini-2.0-flash", "llm", 2.0, 10.0)]
+    path = {span.name: round(seconds, 3) for span, seconds in trace.critical_path()}
+    assert path == {"request": 2.0, "gemini-2.0-flash": 8.0}
+
+
+def test_summary_attributes_time_to_categories_and_tasks():
+    summary = synthetic_trace().summary()
+    assert "6.00s  60.0%  CrewAI task setup and prompt building" in summary
+    assert "4.00s  40.0%  LLM provider calls" in summary
+    assert "1 LLM calls (0 failed)" in summary
+    assert "900+0 tokens" in summary
+
+
+def test_leaves_are_grouped_into_iterations():
+    trace = Trace("request")
+    task = trace.open("market_analysis", "task")
+    task.start = trace.root.start
+    t0 = task.start
+    trace.add_leaf("deepseek/deepseek-r1", "llm", t0 + 1, t0 + 3)
+    trace.add_leaf("search", "tool", t0 + 3.5, t0 + 4)
+    trace.add_leaf("deepseek/deepseek-r1", "llm", t0 + 5, t0 + 6, error="timeout")
+    trace.close(task)
+    task.end = t0 + 7
+    trace.finish()
+
+    iterations = [child for child in task.children if child.category == "iteration"]
+    assert [(it.start - t0, it.end - t0) for it in iterations] == [(1, 5), (5, 7)]
+    assert [c.category for c in iterations[0].children] == ["llm", "tool"]
+    assert iterations[0].attrs["tools"] == ["search"]
+    assert trace.task_rows()[0]["llm_errors"] == 1
+
+
+def test_traced_crew_records_llm_and_tool_spans(tmp_path):
+    llm = ScriptedLLM(model="scripted", script=[SEARCH_STEP, FINAL_ANSWER],
+                      usage={"prompt_tokens": 1200, "completion_tokens": 30, "cached_prompt_tokens": 1024})
+    agent = Agent(role="Researcher", goal="Answer", backstory="Researches", llm=llm, tools=[CountingSearch()])
+    task = Task(description="Find nurse salaries", expected_output="A number", agent=agent)
+    trace = Trace("crew")
+
+    with tracing_scope(trace):
+        begin_task("market_analysis")
+        Crew(agents=[agent], tasks=[task], process=Process.sequential).kickoff()
+        end_task()
+    finish_trace(trace, str(tmp_path / "trace.json"))
+
+    row = trace.task_rows()[0]
+    assert (row["iterations"], row["llm_calls"], row["tool_calls"]) == (2, 2, 1)
+    assert (row["prompt_tokens"], row["cached_tokens"]) == (2400, 2048)
@@ -0,0 +1,373 @@
+# Per-Request Profiling Traces
+# Records a span tree (request -> task -> agent iteration -> LLM call / tool call) for one crew run,
+# exports it as a Chrome trace and summarizes where the time went along the critical path.
+# LLM and tool calls come from CrewAI's event bus (see prompt_cache.py)
+
+import os
+import json
+import time
+import uuid
+import threading
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+from crewai.events import crewai_event_bus
+
+logger = logging.getLogger(__name__)
+
+# Where exported traces are written
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+
+# What the self time of each span category means in the summary
+CATEGORY_LABELS = {
+    "request": "request overhead (routing, cache, report assembly)",
+    "phase": "setup phases",
+    "task": "CrewAI task setup and prompt building",
+    "attempt": "fallback attempt setup",
+    "iteration": "CrewAI prompt building and output parsing",
+    "llm": "LLM provider calls",
+    "tool": "tool calls",
+    "backoff": "retry backoff",
+}
+
+# Spans reported after the fact with their own timestamps, rather than opened around code
+LEAF_CATEGORIES = ("llm", "tool")
+
+
+@dataclass(eq=False)
+class Span:
+    name: str
+    category: str  # request | phase | task | attempt | iteration | llm | tool | backoff
+    start: float
+    end: Optional[float] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    children: List["Span"] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.time()) - self.start
+
+    @property
+    def self_time(self) -> float:
+        """Time not covered by any child span"""
+        end = self.start + self.duration
+        covered = 0.0
+        cursor = self.start
+        for child in sorted(self.children, key=lambda c: c.start):
+            child_start = max(child.start, cursor)
+            child_end = min(child.start + child.duration, end)
+            if child_end > child_start:
+                covered += child_end - child_start
+                cursor = child_end
+        return max(0.0, self.duration - covered)
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "category": self.category,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "self_ms": round(self.self_time * 1000, 3),
+            "attrs": self.attrs,
+            "children": [child.to_dict(origin) for child in self.children],
+        }
+
+
+def _critical_children(span: Span) -> List[Span]:
+    """Children that bound the span's end time, walking back from the last one to finish"""
+    path = []
+    cursor = span.start + span.duration
+    for child in sorted(span.children, key=lambda c: c.start + c.duration, reverse=True):
+        if child.start + child.duration <= cursor + 1e-6:
+            path.append(child)
+            cursor = child.start
+    return list(reversed(path))
+
+
+class Trace:
+    """
+    Span tree for a single crew run
+
+    Spans form a stack: phase, task, attempt and backoff spans are opened and
+    closed around the code they cover. LLM and tool calls arrive as finished
+    leaves from CrewAI's event handler threads, possibly late, so they are only
+    placed when the trace finishes: into the innermost span that was open when
+    they started, grouped into agent iterations that each begin with an LLM call.
+    """
+
+    def __init__(self, name: str, **attrs):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.root = Span(name, "request", time.time(), attrs=attrs)
+        self._stack: List[Span] = [self.root]
+        self._leaves: List[Span] = []
+        self._lock = threading.RLock()
+
+    def open(self, name: str, category: str, **attrs) -> Span:
+        with self._lock:
+            span = Span(name, category, time.time(), attrs=attrs)
+            self._stack[-1].children.append(span)
+            self._stack.append(span)
+            return span
+
+    def close(self, span: Span, **attrs):
+        """End `span` and everything still open inside it (closing twice is a no-op)"""
+        with self._lock:
+            span.attrs.update(attrs)
+            if span.end is not None:
+                return
+            now = time.time()
+            if not any(open_span is span for open_span in self._stack):
+                span.end = now
+                return
+            while self._stack:
+                top = self._stack.pop()
+                top.end = now
+                if top is span:
+                    break
+
+    def innermost(self, category: str) -> Optional[Span]:
+        with self._lock:
+            return next((span for span in reversed(self._stack) if span.category == category), None)
+
+    def close_category(self, category: str, **attrs):
+        """Close the innermost open span of `category`, if any"""
+        with self._lock:
+            span = self.innermost(category)
+            if span is not None:
+                self.close(span, **attrs)
+
+    def add_leaf(self, name: str, category: str, start: float, end: float, **attrs) -> Span:
+        """Record a finished LLM or tool call - placed in the tree by finish()"""
+        with self._lock:
+            span = Span(name, category, start, end, attrs=attrs)
+            self._leaves.append(span)
+            return span
+
+    def _container(self, leaf: Span) -> Span:
+        """Innermost non-leaf span that was running when `leaf` started"""
+        span = self.root
+        while True:
+            child = next((
+                c for c in span.children
+                if c.category not in LEAF_CATEGORIES and c.start <= leaf.start < c.start + c.duration
+            ), None)
+            if child is None:
+                return span
+            span = child
+
+    def _group_iterations(self, span: Span):
+        """Split a span's leaves into agent iterations: an LLM call plus the parsing and tools that follow it"""
+        llm_calls = sorted((c for c in span.children if c.category == "llm"), key=lambda c: c.start)
+        if not llm_calls:
+            return
+        end = span.start + span.duration
+        bounds = [call.start for call in llm_calls] + [end]
+        iterations = [
+            Span(f"iteration {number}", "iteration", bounds[number - 1], bounds[number], attrs={"iteration": number})
+            for number in range(1, len(llm_calls) + 1)
+        ]
+        children = []
+        for child in span.children:
+            owner = None
+            if child.category in LEAF_CATEGORIES:
+                owner = next((it for it in reversed(iterations) if it.start <= child.start), None)
+            (owner.children if owner is not None else children).append(child)
+        for iteration in iterations:
+            tools = [c.name for c in iteration.children if c.category == "tool"]
+            if tools:
+                iteration.attrs["tools"] = tools
+        span.children = sorted(children + iterations, key=lambda c: c.start)
+
+    def finish(self):
+        """Close the whole tree and place the LLM/tool leaves reported by CrewAI"""
+        with self._lock:
+            self.close(self.root)
+            for span in self.root.walk():
+                if span.end is None:
+                    span.end = self.root.end
+                    span.attrs.setdefault("unfinished", True)
+            containers = set()
+            for leaf in sorted(self._leaves, key=lambda c: c.start):
+                container = self._container(leaf)
+                container.children.append(leaf)
+                containers.add(container)
+            self._leaves = []
+            for container in containers:
+                self._group_iterations(container)
+
+    # --- Reporting ---
+
+    def critical_path(self) -> List[Tuple[Span, float]]:
+        """(span, seconds it contributes) for every span on the critical path"""
+        path = []
+
+        def visit(span: Span):
+            children = _critical_children(span)
+            covered = sum(child.duration for child in children)
+            own = span.duration - covered
+            if own > 0:
+                path.append((span, own))
+            for child in children:
+                visit(child)
+
+        visit(self.root)
+        return path
+
+    def task_rows(self) -> List[Dict[str, Any]]:
+        rows = []
+        for task in (span for span in self.root.walk() if span.category == "task"):
+            descendants = list(task.walk())
+            llm_calls = [span for span in descendants if span.category == "llm"]
+            rows.append({
+                "task": task.name,
+                "duration": task.duration,
+                "iterations": sum(1 for span in descendants if span.category == "iteration"),
+                "llm_calls": len(llm_calls),
+                "llm_errors": sum(1 for span in llm_calls if "error" in span.attrs),
+                "tool_calls": sum(1 for span in descendants if span.category == "tool"),
+                "prompt_tokens": sum(span.attrs.get("prompt_tokens", 0) for span in llm_calls),
+                "completion_tokens": sum(span.attrs.get("completion_tokens", 0) for span in llm_calls),
+                "cached_tokens": sum(span.attrs.get("cached_tokens", 0) for span in llm_calls),
+                "backoff": sum(span.duration for span in descendants if span.category == "backoff"),
+            })
+        return rows
+
+    def summary(self, top: int = 8) -> str:
+        total = self.root.duration or 1e-9
+        path = self.critical_path()
+
+        by_category: Dict[str, float] = {}
+        for span, seconds in path:
+            by_category[span.category] = by_category.get(span.category, 0.0) + seconds
+
+        lines = [f"🔍 Trace {self.trace_id} - {self.root.name}: {self.root.duration:.1f}s total", "",
+                 "Critical path by category:"]
+        for category, seconds in sorted(by_category.items(), key=lambda item: item[1], reverse=True):
+            label = CATEGORY_LABELS.get(category, category)
+            lines.append(f"  {seconds:8.2f}s {seconds / total:6.1%}  {label}")
+
+        lines += ["", "Tasks:"]
+        for row in self.task_rows():
+            lines.append(
+                f"  {row['task']:<20} {row['duration']:8.2f}s  {row['iterations']} iterations  "
+                f"{row['llm_calls']} LLM calls ({row['llm_errors']} failed)  {row['tool_calls']} tool calls  "
+                f"{row['prompt_tokens']}+{row['completion_tokens']} tokens ({row['cached_tokens']} cached)  "
+                f"{row['backoff']:.2f}s backoff"
+            )
+
+        lines += ["", "Slowest spans on the critical path:"]
+        for span, seconds in sorted(path, key=lambda item: item[1], reverse=True)[:top]:
+            task = next((s.name for s in self._ancestors(span) if s.category == "task"), "-")
+            lines.append(f"  {seconds:8.2f}s  {span.category:<9} {span.name} [{task}]")
+        return "\n".join(lines)
+
+    def _ancestors(self, target: Span) -> List[Span]:
+        def search(span: Span, trail: List[Span]) -> Optional[List[Span]]:
+            if span is target:
+                return trail
+            for child in span.children:
+                found = search(child, trail + [span])
+                if found is not None:
+                    return found
+            return None
+        return search(self.root, []) or []
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace event format - open in chrome://tracing or ui.perfetto.dev"""
+        origin = self.root.start
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - origin) * 1e6),
+                "dur": round(span.duration * 1e6),
+                "pid": 1,
+                "tid": 1,
+                "args": dict(span.attrs, self_ms=round(span.self_time * 1000, 3)),
+            }
+            for span in sorted(self.root.walk(), key=lambda s: (s.start, -s.duration))
+        ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "traceId": self.trace_id,
+            "spanTree": self.root.to_dict(origin),
+        }
+
+    def export(self, path: Optional[str] = None) -> str:
+        path = path or os.path.join(TRACE_DIR, f"{self.trace_id}.json")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+        return path
+
+
+# Trace for the crew run executing in the current thread/context
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("crew_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def tracing_scope(trace: Optional[Trace]):
+    """Make `trace` (or no trace) current for everything run from this context"""
+    reset = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(reset)
+
+
+@contextmanager
+def trace_span(name: str, category: str, **attrs):
+    """Record the enclosed block as a span - a no-op when the run is not traced"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    span = trace.open(name, category, **attrs)
+    try:
+        yield span
+    except BaseException as e:
+        span.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        trace.close(span)
+
+
+def begin_task(name: str, **attrs):
+    """Start the span of the next crew task (ends the previous one if still open)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.close_category("task")
+        trace.open(name, "task", **attrs)
+
+
+def end_task(**attrs):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.close_category("task", **attrs)
+
+
+def finish_trace(trace: Trace, path: Optional[str] = None) -> str:
+    """Close the trace, write the Chrome trace file and log the critical-path summary"""
+    crewai_event_bus.flush(timeout=5.0)  # LLM/tool events still being handled belong to this trace
+    trace.finish()
+
+    path = trace.export(path)
+    print(trace.summary())
+    print(f"📈 Trace written to {path} (open in chrome://tracing or ui.perfetto.dev)")
+    return path